@@ -1,24 +1,61 @@
 import os
+import sys
 import uuid
 import pandas as pd
 import numpy as np
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, request, jsonify, send_file, g, Response
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, date, time as dt_time
 from openpyxl import load_workbook, Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, Border, Side, Font, PatternFill
 import traceback
 import re
-from collections import OrderedDict
+from collections import OrderedDict, Counter
 import warnings
+import hashlib
+import hmac
+import json
+import io
+import csv
+import gzip
+import zlib
+import mimetypes
+import functools
+import threading
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 
+# Optional fast reader engine (pip install python-calamine)
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Strings pandas' readers turn into NaN by default; the calamine reader must match
+try:
+    from pandas._libs.parsers import STR_NA_VALUES as PANDAS_NA_VALUES
+except ImportError:
+    PANDAS_NA_VALUES = {
+        '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+        '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+    }
+
+# Optional brotli pre-compression of static assets (pip install Brotli)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__, static_folder='.', static_url_path='')
-CORS(app, resources={r"/*": {"origins": "*"}})
+CORS(app, resources={r"/*": {"origins": "*"}},
+     expose_headers=['ETag', 'Last-Modified', 'Accept-Ranges', 'Content-Range', 'Content-Length',
+                     'Content-Disposition', 'Retry-After', 'X-Profile-Id'])
 
 # ---------- GLOBAL ERROR HANDLERS (return JSON instead of HTML) ----------
 @app.errorhandler(RequestEntityTooLarge)
@@ -53,9 +90,91 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+# Chunked (resumable) uploads for files beyond the single-request limit
+CHUNK_SIZE = 5 * 1024 * 1024  # 5MB per PUT
+MAX_CHUNKED_FILE_SIZE = 1024 * 1024 * 1024  # 1GB per file
+UPLOAD_SESSION_TTL = 3600  # seconds
+
+# Rows streamed per sheet by /inspect for header detection
+INSPECT_SAMPLE_ROWS = 50
+
+# On-demand profiling: send X-Profile (or ?profile=) with this token; disabled when unset
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+# Kept outside the app directory, which Flask serves as static files without the token
+PROFILE_FOLDER = os.environ.get('PROFILE_FOLDER', os.path.join(tempfile.gettempdir(), 'excel-merge-profiles'))
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_TOP_N = 25
+MAX_STORED_PROFILES = 50
+
+os.makedirs(PROFILE_FOLDER, exist_ok=True)
+
+# Static assets served pre-compressed; versioned URLs (?v=<hash>) are cached for a year
+STATIC_ASSETS = ['script.js', 'style.css', 'bootstrap.min.js', 'bootstrp.min.css']
+STATIC_MAX_AGE = 365 * 24 * 3600
+CSV_STREAM_BUFFER = 64 * 1024
+
+# Whole-merge result cache keyed by input hashes and merge options
+MERGE_CACHE_MAX_ENTRIES = 32
+MERGE_CACHE_TTL = 3600  # seconds
+MERGE_CACHE_VERSION = 1  # bump when merge output changes for the same inputs
+
+# Merge modes: stack rows (default) or join tables on key columns
+MERGE_MODES = {'stack', 'join'}
+JOIN_TYPES = {'inner', 'left', 'outer'}
+
+# Spreadsheet reader engines: 'auto' picks by file type and size, or force one by name
+READER_ENGINE = os.environ.get('READER_ENGINE', 'auto')
+FAST_READER_MIN_SIZE = 256 * 1024  # below this openpyxl is fast enough
+
+# Memory-aware admission control for concurrent merges
+MERGE_MEMORY_BUDGET = int(os.environ.get('MERGE_MEMORY_BUDGET_MB', 384)) * 1024 * 1024
+MERGE_BASE_MEMORY = 50 * 1024 * 1024  # 50MB per merge regardless of input
+# Peak memory per uploaded byte; xlsx is zip-compressed so it expands the most
+MEMORY_COST_FACTORS = {'xlsx': 40, 'xlsm': 40, 'xls': 10, 'csv': 8}
+ADMISSION_MAX_WAIT = 30  # seconds a merge may wait for memory before a 429
+# Request threads per worker. gunicorn.conf.py's post_worker_init hook replaces this
+# with the worker's real setting (--threads and GUNICORN_CMD_ARGS included)
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 4))
+# Threads kept free of merges for /health, /download and chunk uploads
+ADMISSION_RESERVED_THREADS = 2
+# Merges running or waiting beyond which a new merge is rejected at once
+ADMISSION_MAX_IN_FLIGHT = max(1, WORKER_THREADS - ADMISSION_RESERVED_THREADS)
+ADMISSION_RETRY_AFTER = 10  # seconds
+
 # Store processed files temporarily
 processed_files = {}
 
+# Chunked upload sessions, keyed by upload_id
+upload_sessions = {}
+upload_lock = threading.Lock()
+
+# Completed chunked uploads are parsed here while the remaining files upload
+PARSE_THREAD_PREFIX = 'chunked-parse'
+parse_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=PARSE_THREAD_PREFIX)
+
+# Compressed variants of each static asset, rebuilt when the file changes
+static_asset_cache = {}
+static_asset_lock = threading.Lock()
+
+# Cached merge results (LRU order) and how many sessions/cache entries use each output file
+merge_cache = OrderedDict()
+output_refs = {}
+merge_cache_lock = threading.Lock()
+merge_cache_stats = {
+    'hits': 0,
+    'misses': 0
+}
+
+# Memory reserved by running merges and how many are waiting for it
+admission_condition = threading.Condition()
+admission_state = {
+    'memory_in_use': 0,
+    'active': 0,
+    'queued': 0,
+    'awaiting_parse': 0,
+    'parsing': 0
+}
+
 # Global statistics (shared across all users)
 global_stats = {
     "totalSheetsMerged": 0,
@@ -66,6 +185,95 @@ global_stats = {
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def uploaded_file_size(file):
+    """Size in bytes of an uploaded file without reading it into memory"""
+    file.stream.seek(0, os.SEEK_END)
+    size = file.stream.tell()
+    file.stream.seek(0)
+    return size
+
+def estimate_merge_memory(file_sizes):
+    """Estimate the peak memory of a merge from (filename, size) pairs of its inputs"""
+    estimate = MERGE_BASE_MEMORY
+    for filename, size in file_sizes:
+        extension = filename.rsplit('.', 1)[-1].lower()
+        estimate += size * MEMORY_COST_FACTORS.get(extension, 40)
+    
+    # A merge bigger than the whole budget can still run, just on its own
+    return min(estimate, MERGE_MEMORY_BUDGET)
+
+def set_worker_threads(threads):
+    """Size the merge in-flight limit to the worker's request threads"""
+    global WORKER_THREADS, ADMISSION_MAX_IN_FLIGHT
+    WORKER_THREADS = max(1, int(threads))
+    ADMISSION_MAX_IN_FLIGHT = max(1, WORKER_THREADS - ADMISSION_RESERVED_THREADS)
+
+def merges_in_flight():
+    """Merges holding a request thread: running, waiting for memory or for their uploads' parses"""
+    return admission_state['active'] + admission_state['queued'] + admission_state['awaiting_parse']
+
+def begin_parse_wait():
+    """Count a merge waiting on background parses against the in-flight limit; False if full"""
+    with admission_condition:
+        if merges_in_flight() >= ADMISSION_MAX_IN_FLIGHT:
+            return False
+        admission_state['awaiting_parse'] += 1
+        return True
+
+def end_parse_wait():
+    with admission_condition:
+        admission_state['awaiting_parse'] -= 1
+
+def acquire_merge_memory(cost):
+    """
+    Reserve memory for a merge, waiting up to ADMISSION_MAX_WAIT seconds for
+    running merges to release it. Returns False if the merge should be rejected.
+    """
+    def fits():
+        return admission_state['memory_in_use'] + cost <= MERGE_MEMORY_BUDGET
+    
+    with admission_condition:
+        # Running and waiting merges both hold request threads, so leave some free
+        if merges_in_flight() >= ADMISSION_MAX_IN_FLIGHT:
+            return False
+        
+        if not fits():
+            admission_state['queued'] += 1
+            try:
+                admitted = admission_condition.wait_for(fits, timeout=ADMISSION_MAX_WAIT)
+            finally:
+                admission_state['queued'] -= 1
+            
+            if not admitted:
+                return False
+        
+        admission_state['memory_in_use'] += cost
+        admission_state['active'] += 1
+        return True
+
+def release_merge_memory(cost):
+    """Return a merge's reservation to the budget and wake queued merges"""
+    with admission_condition:
+        admission_state['memory_in_use'] -= cost
+        admission_state['active'] -= 1
+        admission_condition.notify_all()
+
+def acquire_parse_memory(cost):
+    """
+    Reserve memory for a background parse of a chunked upload. These run on
+    parse_executor rather than request threads, so they wait without a time limit.
+    """
+    with admission_condition:
+        admission_condition.wait_for(lambda: admission_state['memory_in_use'] + cost <= MERGE_MEMORY_BUDGET)
+        admission_state['memory_in_use'] += cost
+        admission_state['parsing'] += 1
+
+def release_parse_memory(cost):
+    with admission_condition:
+        admission_state['memory_in_use'] -= cost
+        admission_state['parsing'] -= 1
+        admission_condition.notify_all()
+
 def smart_detect_header(df_raw, sheet_name, filename):
     """
     Smart header detection that analyzes patterns to find the correct header row
@@ -127,18 +335,132 @@ def preserve_special_characters(text):
     text = re.sub(r'\s+', ' ', text)
     return text
 
+def clean_header_columns(header_values):
+    """Turn detected header cells into unique, cleaned column names"""
+    clean_columns = []
+    for idx, col_value in enumerate(header_values):
+        if pd.isna(col_value) or str(col_value).strip() == '':
+            clean_columns.append(f"Column_{idx+1}")
+        else:
+            cleaned = preserve_special_characters(col_value)
+            if cleaned:
+                clean_columns.append(cleaned)
+            else:
+                clean_columns.append(f"Column_{idx+1}")
+    
+    seen = {}
+    for i, col in enumerate(clean_columns):
+        if col in seen:
+            count = seen[col] + 1
+            clean_columns[i] = f"{col}_{count}"
+            seen[col] = count
+        else:
+            seen[col] = 0
+    
+    return clean_columns
+
+def calamine_cell_to_str(value):
+    """Convert a calamine cell to the string pandas' openpyxl reader would give with dtype=str"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return str(value)
+
+def rows_to_dataframe(rows, header):
+    """Build the same frame pd.read_excel(header=None or 0, dtype=str) returns from raw rows"""
+    rows = [[calamine_cell_to_str(value) for value in row] for row in rows]
+    
+    while rows and all(value is None for value in rows[-1]):
+        rows.pop()
+    
+    width = max((max((i + 1 for i, v in enumerate(row) if v is not None), default=0) for row in rows), default=0)
+    rows = [(row + [None] * width)[:width] for row in rows]
+    
+    if not rows or width == 0:
+        return pd.DataFrame()
+    
+    # pandas applies its default na_values to every cell except header names
+    first_data_row = 0 if header is None else 1
+    rows = rows[:first_data_row] + [[None if value in PANDAS_NA_VALUES else value for value in row]
+                                    for row in rows[first_data_row:]]
+    
+    if header is None:
+        return pd.DataFrame(rows, dtype=object)
+    
+    # Same naming pandas applies to blank and repeated header cells
+    columns = []
+    seen = {}
+    for idx, value in enumerate(rows[0]):
+        name = value if value is not None else f"Unnamed: {idx}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    
+    return pd.DataFrame(rows[1:], columns=columns, dtype=object)
+
+def read_sheets_calamine(file_path, header):
+    workbook = CalamineWorkbook.from_path(file_path)
+    sheets = OrderedDict()
+    for sheet_name in workbook.sheet_names:
+        rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+        sheets[sheet_name] = rows_to_dataframe(rows, header)
+    return sheets
+
+def read_sheets_openpyxl(file_path, header):
+    return pd.read_excel(file_path, sheet_name=None, header=header, dtype=str, engine='openpyxl')
+
+def read_sheets_xlrd(file_path, header):
+    return pd.read_excel(file_path, sheet_name=None, header=header, dtype=str, engine='xlrd')
+
+# Every engine returns {sheet_name: DataFrame of string cells} in workbook order
+READER_ENGINES = {
+    'calamine': read_sheets_calamine,
+    'openpyxl': read_sheets_openpyxl,
+    'xlrd': read_sheets_xlrd
+}
+
+def select_reader_engines(file_path, filename):
+    """Engines to try for a workbook, fastest first, ending with the pandas reference engines"""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    fallbacks = ['xlrd', 'openpyxl'] if extension == 'xls' else ['openpyxl']
+    
+    if READER_ENGINE in READER_ENGINES:
+        if READER_ENGINE == 'calamine' and CalamineWorkbook is None:
+            return fallbacks
+        return [READER_ENGINE] + [e for e in fallbacks if e != READER_ENGINE]
+    
+    if CalamineWorkbook is not None and os.path.getsize(file_path) >= FAST_READER_MIN_SIZE:
+        return ['calamine'] + fallbacks
+    
+    return fallbacks
+
+def read_workbook_sheets(file_path, filename, header):
+    """Read every sheet with the best available engine; returns (engine_name, sheets)"""
+    engines = select_reader_engines(file_path, filename)
+    
+    for i, engine in enumerate(engines):
+        try:
+            return engine, READER_ENGINES[engine](file_path, header)
+        except Exception as e:
+            if i == len(engines) - 1:
+                raise
+            print(f"Reader engine {engine} failed for {filename}, falling back: {str(e)[:100]}")
+
 def read_excel_file_advanced(file_path, filename):
     """Advanced Excel file reader with better header detection and structure preservation"""
     all_sheets_data = []
     
     try:
-        excel_file = pd.ExcelFile(file_path)
-        sheet_names = excel_file.sheet_names
+        engine, raw_sheets = read_workbook_sheets(file_path, filename, header=None)
         
-        for sheet_name in sheet_names:
+        for sheet_name, df_raw in raw_sheets.items():
             try:
-                df_raw = pd.read_excel(file_path, sheet_name=sheet_name, header=None, dtype=str)
-                
                 if df_raw.empty:
                     continue
                 
@@ -152,25 +474,7 @@ def read_excel_file_advanced(file_path, filename):
                 
                 header_row_idx, header_values = smart_detect_header(df_raw, sheet_name, filename)
                 
-                clean_columns = []
-                for idx, col_value in enumerate(header_values):
-                    if pd.isna(col_value) or str(col_value).strip() == '':
-                        clean_columns.append(f"Column_{idx+1}")
-                    else:
-                        cleaned = preserve_special_characters(col_value)
-                        if cleaned:
-                            clean_columns.append(cleaned)
-                        else:
-                            clean_columns.append(f"Column_{idx+1}")
-                
-                seen = {}
-                for i, col in enumerate(clean_columns):
-                    if col in seen:
-                        count = seen[col] + 1
-                        clean_columns[i] = f"{col}_{count}"
-                        seen[col] = count
-                    else:
-                        seen[col] = 0
+                clean_columns = clean_header_columns(header_values)
                 
                 data_start = header_row_idx + 1
                 
@@ -210,6 +514,7 @@ def read_excel_file_advanced(file_path, filename):
                     sheet_data = {
                         'sheet_name': sheet_name,
                         'filename': filename,
+                        'engine': engine,
                         'tables': [{
                             'data': data_df,
                             'dataframe': data_df,
@@ -237,7 +542,7 @@ def read_excel_file_advanced(file_path, filename):
 def read_excel_file_simple(file_path, filename):
     """Simple fallback Excel reader"""
     try:
-        df = pd.read_excel(file_path, sheet_name=None, dtype=str)
+        engine, df = read_workbook_sheets(file_path, filename, header=0)
         all_sheets_data = []
         
         for sheet_name, sheet_df in df.items():
@@ -254,6 +559,7 @@ def read_excel_file_simple(file_path, filename):
             sheet_data = {
                 'sheet_name': sheet_name,
                 'filename': filename,
+                'engine': engine,
                 'tables': [{
                     'data': sheet_df,
                     'dataframe': sheet_df,
@@ -316,6 +622,7 @@ def read_csv_file_advanced(file_path, filename):
         sheet_data = {
             'sheet_name': 'CSV_Sheet',
             'filename': filename,
+            'engine': 'csv',
             'tables': [{
                 'data': df,
                 'dataframe': df,
@@ -346,6 +653,172 @@ def extract_file_data(file_path, filename):
         traceback.print_exc()
         return []
 
+def merge_input_order(file_count, upload_count, upload_positions):
+    """
+    Order of a merge's inputs as ('file', index) / ('upload', index) pairs.
+    upload_positions gives each chunked upload's place in the user's selection;
+    without it the uploads follow the multipart files. Returns None when the
+    positions are not one distinct, in-range slot per upload.
+    """
+    if not upload_positions:
+        return [('file', i) for i in range(file_count)] + [('upload', i) for i in range(upload_count)]
+    
+    try:
+        positions = [int(position) for position in upload_positions]
+    except ValueError:
+        return None
+    
+    total = file_count + upload_count
+    if len(positions) != upload_count or len(set(positions)) != upload_count or \
+            any(position < 0 or position >= total for position in positions):
+        return None
+    
+    order = [None] * total
+    for i, position in enumerate(positions):
+        order[position] = ('upload', i)
+    
+    file_indexes = iter(range(file_count))
+    return [slot or ('file', next(file_indexes)) for slot in order]
+
+def parse_uploaded_file(file_path, filename):
+    """Parse an assembled chunked upload in the background, then remove it"""
+    extension = filename.rsplit('.', 1)[-1].lower()
+    parse_memory = min(os.path.getsize(file_path) * MEMORY_COST_FACTORS.get(extension, 40), MERGE_MEMORY_BUDGET)
+    
+    # Parses count against the same budget as merges
+    acquire_parse_memory(parse_memory)
+    try:
+        print(f"Processing (chunked upload): {filename}")
+        return extract_file_data(file_path, filename)
+    finally:
+        release_parse_memory(parse_memory)
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except:
+            pass
+
+def inspect_top_rows(rows, sheet_name, filename, width=0):
+    """
+    Run header detection on a sample of leading rows of Python cell values.
+    Cells go through the same string conversion and NA mapping as the reader
+    engines, so header detection sees what /merge sees. Columns are kept up to
+    the sheet's width: one that is empty in the sample may still hold data further
+    down, and /merge only drops columns empty in the whole sheet.
+    """
+    df_raw = rows_to_dataframe([list(row) for row in rows], header=None)
+    width = max(width or 0, len(df_raw.columns))
+    df_raw = df_raw.reindex(columns=range(width))
+    
+    df_raw = df_raw.dropna(how='all', axis=0)
+    
+    if df_raw.empty:
+        return None, []
+    
+    original_rows = df_raw.index.tolist()
+    df_raw = df_raw.reset_index(drop=True)
+    
+    header_row_idx, header_values = smart_detect_header(df_raw, sheet_name, filename)
+    
+    return int(original_rows[header_row_idx]) + 1, clean_header_columns(header_values)
+
+def xlrd_cell_value(value, cell_type, datemode):
+    """Convert a raw xlrd cell the way pandas' xlrd reader does (dates, booleans, errors)"""
+    import xlrd
+    
+    if cell_type == xlrd.XL_CELL_DATE:
+        try:
+            value = xlrd.xldate.xldate_as_datetime(value, datemode)
+        except OverflowError:
+            return value
+        # Dates on the epoch are time-only cells
+        if value.timetuple()[0:3] == ((1904, 1, 1) if datemode else (1899, 12, 31)):
+            value = dt_time(value.hour, value.minute, value.second, value.microsecond)
+    elif cell_type == xlrd.XL_CELL_ERROR:
+        value = None
+    elif cell_type == xlrd.XL_CELL_BOOLEAN:
+        value = bool(value)
+    return value
+
+def inspect_file(file_path, filename):
+    """
+    Describe each sheet (name, approximate size, detected header row and columns)
+    by streaming only the first INSPECT_SAMPLE_ROWS rows instead of parsing every cell
+    """
+    sheets = []
+    extension = filename.rsplit('.', 1)[1].lower()
+    
+    if extension == 'csv':
+        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'utf-16-le', 'utf-16-be']
+        df_top = None
+        for encoding in encodings:
+            try:
+                df_top = pd.read_csv(file_path, encoding=encoding, dtype=str,
+                                     nrows=INSPECT_SAMPLE_ROWS, on_bad_lines='skip')
+                break
+            except Exception:
+                continue
+        
+        if df_top is None or len(df_top.columns) == 0:
+            return sheets
+        
+        line_count = 0
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                line_count += block.count(b'\n')
+        
+        # CSVs are merged with their first line as the header, so report exactly that
+        sheets.append({
+            'sheet_name': 'CSV_Sheet',
+            'approx_rows': line_count,
+            'approx_columns': len(df_top.columns),
+            'header_row': 1,
+            'columns': clean_header_columns(list(df_top.columns))
+        })
+    
+    elif extension == 'xls':
+        import xlrd
+        book = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            for sheet_name in book.sheet_names():
+                sheet = book.sheet_by_name(sheet_name)
+                rows = [[xlrd_cell_value(value, cell_type, book.datemode)
+                         for value, cell_type in zip(sheet.row_values(i), sheet.row_types(i))]
+                        for i in range(min(INSPECT_SAMPLE_ROWS, sheet.nrows))]
+                header_row, columns = inspect_top_rows(rows, sheet_name, filename, sheet.ncols) if rows else (None, [])
+                sheets.append({
+                    'sheet_name': sheet_name,
+                    'approx_rows': sheet.nrows,
+                    'approx_columns': sheet.ncols,
+                    'header_row': header_row,
+                    'columns': columns
+                })
+                book.unload_sheet(sheet_name)
+        finally:
+            book.release_resources()
+    
+    else:
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                # Start at the sheet's first used column, as /merge drops leading empty columns
+                min_col = ws.min_column or 1
+                rows = list(ws.iter_rows(min_col=min_col, max_row=INSPECT_SAMPLE_ROWS, values_only=True))
+                width = (ws.max_column or 0) - min_col + 1
+                header_row, columns = inspect_top_rows(rows, ws.title, filename, width) if rows else (None, [])
+                sheets.append({
+                    'sheet_name': ws.title,
+                    # Taken from the sheet's stored dimension, so it is only approximate
+                    'approx_rows': ws.max_row,
+                    'approx_columns': ws.max_column,
+                    'header_row': header_row,
+                    'columns': columns
+                })
+        finally:
+            wb.close()
+    
+    return sheets
+
 def intelligent_column_matching(all_sheets_data):
     """
     Intelligently match columns across different sheets/files
@@ -528,13 +1001,387 @@ def merge_all_data(all_sheets_data):
     
     return consolidated_df, all_header_data, all_merged_cells, sheet_info
 
-def create_output_excel(df, output_path, header_data_list, merged_cells_list):
+class JoinError(Exception):
+    """Raised when a join cannot be performed with the requested keys"""
+    pass
+
+def normalize_join_key(values):
+    """Key tuple used for matching; rows with a blank key part never match"""
+    key = tuple(str(value).strip() for value in values)
+    if any(part == '' or part.lower() == 'nan' for part in key):
+        return None
+    return key
+
+def join_cell_number(value):
+    """Number for a numeric-looking join cell; blanks and other text are returned unchanged"""
+    if isinstance(value, str):
+        text = value.strip()
+        if re.match(r'^-?\d+\.?\d*$', text):
+            return float(text) if '.' in text else int(text)
+    return value
+
+def convert_numeric_columns(df):
+    """
+    Convert mostly-numeric text columns of a join to numbers, as the stacking merge does.
+    Blank cells stay blank rather than 0: after a left or outer join they are lookups
+    that found no match, which must not read as a real zero.
+    """
+    for col in df.columns:
+        if col in ['Source_File', 'Source_Sheet']:
+            continue
+        
+        values = df[col].astype(str).str.strip()
+        non_empty = values != ''
+        total_count = non_empty.sum()
+        numeric_count = (values.str.match(r'^-?\d+\.?\d*$') & non_empty).sum()
+        
+        if total_count > 0 and (numeric_count / total_count) > 0.5:
+            df[col] = df[col].map(join_cell_number)
+    
+    return df
+
+def hash_join(left_df, right_df, left_keys, right_keys, join_type):
+    """
+    Join two tables on key columns. A hash index is built on the smaller table
+    and the larger one is streamed through it row by row. Output keeps the left
+    table's row order either way, with unmatched right rows (outer joins) last.
+    Returns the joined DataFrame and a report of matched/unmatched counts.
+    """
+    source_cols = ['source_file', 'source_sheet']
+    
+    # Right-hand columns added to the output, renamed on clashes with the left table
+    existing = {str(col).strip().lower() for col in left_df.columns}
+    right_extra_idx = []
+    right_extra_names = []
+    for idx, col in enumerate(right_df.columns):
+        if col in right_keys or str(col).strip().lower() in source_cols:
+            continue
+        name = col
+        count = 1
+        while str(name).strip().lower() in existing:
+            count += 1
+            name = f"{col}_{count}"
+        existing.add(str(name).strip().lower())
+        right_extra_idx.append(idx)
+        right_extra_names.append(name)
+    
+    # How to fill the left-hand columns for right rows that found no partner
+    right_positions = {str(col).strip().lower(): idx for idx, col in enumerate(right_df.columns)}
+    left_fill_from_right = []
+    for col in left_df.columns:
+        if col in left_keys:
+            left_fill_from_right.append(right_df.columns.get_loc(right_keys[left_keys.index(col)]))
+        elif str(col).strip().lower() in source_cols:
+            left_fill_from_right.append(right_positions.get(str(col).strip().lower()))
+        else:
+            left_fill_from_right.append(None)
+    
+    empty_right = [''] * len(right_extra_idx)
+    
+    def combine(left_row, right_row):
+        if left_row is None:
+            left_part = ['' if idx is None else right_row[idx] for idx in left_fill_from_right]
+        else:
+            left_part = list(left_row)
+        right_part = empty_right if right_row is None else [right_row[idx] for idx in right_extra_idx]
+        return left_part + right_part
+    
+    left_key_idx = [left_df.columns.get_loc(key) for key in left_keys]
+    right_key_idx = [right_df.columns.get_loc(key) for key in right_keys]
+    
+    build_is_left = len(left_df) <= len(right_df)
+    if build_is_left:
+        build_rows, build_key_idx = left_df.values.tolist(), left_key_idx
+        probe_df, probe_key_idx = right_df, right_key_idx
+    else:
+        build_rows, build_key_idx = right_df.values.tolist(), right_key_idx
+        probe_df, probe_key_idx = left_df, left_key_idx
+    
+    keep_unmatched_build = join_type == 'outer' or (join_type == 'left' and build_is_left)
+    keep_unmatched_probe = join_type == 'outer' or (join_type == 'left' and not build_is_left)
+    
+    index = {}
+    for i, row in enumerate(build_rows):
+        key = normalize_join_key([row[j] for j in build_key_idx])
+        if key is not None:
+            index.setdefault(key, []).append(i)
+    
+    output_rows = []
+    # (left position, right position) of each output row when the left table is indexed
+    output_order = []
+    matched_build = bytearray(len(build_rows))
+    matched_keys = set()
+    unmatched_probe_keys = set()
+    unmatched_probe_rows = 0
+    matched_rows = 0
+    
+    for probe_pos, row in enumerate(probe_df.itertuples(index=False, name=None)):
+        key = normalize_join_key([row[j] for j in probe_key_idx])
+        matches = index.get(key) if key is not None else None
+        
+        if matches:
+            matched_keys.add(key)
+            for i in matches:
+                matched_build[i] = 1
+                if build_is_left:
+                    output_rows.append(combine(build_rows[i], row))
+                    output_order.append((i, probe_pos))
+                else:
+                    output_rows.append(combine(row, build_rows[i]))
+                matched_rows += 1
+        else:
+            unmatched_probe_rows += 1
+            if key is not None:
+                unmatched_probe_keys.add(key)
+            if keep_unmatched_probe:
+                if build_is_left:
+                    output_rows.append(combine(None, row))
+                    output_order.append((len(build_rows), probe_pos))
+                else:
+                    output_rows.append(combine(row, None))
+    
+    unmatched_build_rows = 0
+    for i, row in enumerate(build_rows):
+        if not matched_build[i]:
+            unmatched_build_rows += 1
+            if keep_unmatched_build:
+                if build_is_left:
+                    output_rows.append(combine(row, None))
+                    output_order.append((i, -1))
+                else:
+                    output_rows.append(combine(None, row))
+    
+    # Streaming the right table emits rows in its order; put them back in the left's
+    if build_is_left:
+        output_rows = [output_rows[i] for i in sorted(range(len(output_rows)), key=output_order.__getitem__)]
+    
+    unmatched_build_keys = len(index.keys() - matched_keys)
+    
+    joined_df = pd.DataFrame(output_rows, columns=list(left_df.columns) + right_extra_names)
+    joined_df = joined_df.fillna('')
+    
+    report = {
+        'matched_rows': matched_rows,
+        'unmatched_left_rows': unmatched_build_rows if build_is_left else unmatched_probe_rows,
+        'unmatched_right_rows': unmatched_probe_rows if build_is_left else unmatched_build_rows,
+        'unmatched_left_keys': unmatched_build_keys if build_is_left else len(unmatched_probe_keys),
+        'unmatched_right_keys': len(unmatched_probe_keys) if build_is_left else unmatched_build_keys,
+        'index_side': 'left' if build_is_left else 'right'
+    }
+    
+    return joined_df, report
+
+def join_all_data(all_sheets_data, join_keys, join_type):
+    """
+    Join all tables on the given key columns, left to right in upload order.
+    Key names are matched through intelligent_column_matching, so spelling
+    and case only need to match the way the stacking merge matches columns.
+    """
+    tables = []
+    for sheet_data in all_sheets_data:
+        for table_data in sheet_data.get('tables', []):
+            df = table_data.get('dataframe')
+            if df is not None and not df.empty:
+                tables.append((f"{sheet_data['filename']} - {sheet_data['sheet_name']}", df))
+    
+    if len(tables) < 2:
+        raise JoinError('Join mode needs at least two sheets with data')
+    
+    unified_columns = intelligent_column_matching(all_sheets_data)
+    unified_by_clean = {str(col).strip().lower(): col for col in unified_columns}
+    
+    key_names = []
+    for key in join_keys:
+        unified_key = unified_by_clean.get(str(key).strip().lower())
+        if unified_key is None:
+            raise JoinError(f'Join key "{key}" was not found in any sheet')
+        key_names.append(unified_key)
+    
+    def table_keys(label, df):
+        columns_by_clean = {str(col).strip().lower(): col for col in df.columns}
+        keys = []
+        for key in key_names:
+            col = columns_by_clean.get(str(key).strip().lower())
+            if col is None:
+                raise JoinError(f'Join key "{key}" was not found in {label}')
+            keys.append(col)
+        return keys
+    
+    label, joined_df = tables[0]
+    joined_keys = table_keys(label, joined_df)
+    steps = []
+    
+    for label, df in tables[1:]:
+        joined_df, step = hash_join(joined_df, df, joined_keys, table_keys(label, df), join_type)
+        step['right'] = label
+        steps.append(step)
+    
+    joined_df = convert_numeric_columns(joined_df)
+    
+    join_report = {
+        'type': join_type,
+        'keys': key_names,
+        'left': tables[0][0],
+        'steps': steps
+    }
+    
+    return joined_df, join_report
+
+def summary_number(value):
+    """JSON-safe number from a pandas aggregate"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    return round(float(value), 6)
+
+def compute_merge_summary(df):
+    """
+    Per Source_File/Source_Sheet row counts, numeric sum/min/max/mean and empty-cell
+    counts, computed in one vectorized groupby over the merged data. Grand totals
+    are derived from the group aggregates rather than by scanning the data again.
+    """
+    group_cols = [col for col in ['Source_File', 'Source_Sheet'] if col in df.columns]
+    value_cols = [col for col in df.columns if col not in group_cols]
+    numeric_dtype_cols = {col for col in value_cols if pd.api.types.is_numeric_dtype(df[col])}
+    
+    # Empty-cell indicators travel through the same groupby as the numeric columns.
+    # Only text columns can hold '' cells, so numeric ones skip the comparison.
+    null_names = {col: f"__null_{idx}" for idx, col in enumerate(value_cols)}
+    blanks = {col: df[col].isna() if col in numeric_dtype_cols else df[col].isna() | (df[col] == '')
+              for col in value_cols}
+    frame = pd.DataFrame({null_names[col]: blanks[col].astype('int64') for col in value_cols}, index=df.index)
+    
+    # Join output keeps unmatched cells blank, so numbers can share a column with ''
+    numeric_cols = []
+    for col in value_cols:
+        if col in numeric_dtype_cols:
+            frame[col] = df[col]
+        elif not blanks[col].all() and df[col][~blanks[col]].map(
+                lambda value: isinstance(value, (int, float, np.number)) and not isinstance(value, bool)).all():
+            frame[col] = pd.to_numeric(df[col].where(~blanks[col]))
+        else:
+            continue
+        numeric_cols.append(col)
+    frame['__rows'] = 1
+    
+    aggregations = {col: ['sum', 'min', 'max', 'mean', 'count'] for col in numeric_cols}
+    # Lists keep the result's columns a MultiIndex even when nothing is numeric
+    aggregations.update({null_names[col]: ['sum'] for col in value_cols})
+    aggregations['__rows'] = ['sum']
+    
+    # Without source columns the whole table is a single group
+    keys = group_cols or ['__all']
+    for col in group_cols:
+        frame[col] = df[col]
+    if not group_cols:
+        frame['__all'] = ''
+    grouped = frame.groupby(keys, sort=False).agg(aggregations)
+    
+    groups = []
+    # Non-blank numeric cells per group, so the grand mean ignores blanks too
+    value_counts = []
+    for group_key, row in grouped.iterrows():
+        group_key = group_key if isinstance(group_key, tuple) else (group_key,)
+        entry = {
+            'source_file': group_key[0] if 'Source_File' in group_cols else '',
+            'source_sheet': group_key[group_cols.index('Source_Sheet')] if 'Source_Sheet' in group_cols else '',
+            'rows': int(row[('__rows', 'sum')]),
+            'columns': {}
+        }
+        for col in value_cols:
+            stats = {'nulls': int(row[(null_names[col], 'sum')])}
+            if col in numeric_cols:
+                stats.update({
+                    'sum': summary_number(row[(col, 'sum')]),
+                    'min': summary_number(row[(col, 'min')]),
+                    'max': summary_number(row[(col, 'max')]),
+                    'mean': summary_number(row[(col, 'mean')])
+                })
+            entry['columns'][str(col)] = stats
+        groups.append(entry)
+        value_counts.append({col: int(row[(col, 'count')]) for col in numeric_cols})
+    
+    totals = {'rows': sum(group['rows'] for group in groups), 'columns': {}}
+    for col in value_cols:
+        col_groups = [group['columns'][str(col)] for group in groups]
+        stats = {'nulls': sum(item['nulls'] for item in col_groups)}
+        if col in numeric_cols:
+            counted = [(item, counts[col]) for item, counts in zip(col_groups, value_counts) if counts[col]]
+            total_sum = sum(item['sum'] for item, _ in counted)
+            total_values = sum(count for _, count in counted)
+            stats.update({
+                'sum': summary_number(total_sum),
+                'min': min((item['min'] for item, _ in counted), default=None),
+                'max': max((item['max'] for item, _ in counted), default=None),
+                'mean': summary_number(total_sum / total_values) if total_values else None
+            })
+        totals['columns'][str(col)] = stats
+    
+    return {
+        'numeric_columns': [str(col) for col in numeric_cols],
+        'groups': groups,
+        'totals': totals
+    }
+
+def write_summary_sheet(wb, summary):
+    """Add a "Summary" sheet with one row per source file/sheet and a grand total row"""
+    ws = wb.create_sheet("Summary")
+    
+    headers = ['Source_File', 'Source_Sheet', 'Rows']
+    for col in summary['numeric_columns']:
+        headers.extend([f"{col} Sum", f"{col} Min", f"{col} Max", f"{col} Mean"])
+    headers.append('Empty Cells')
+    
+    header_border = Border(
+        left=Side(style='thin', color="000000"),
+        right=Side(style='thin', color="000000"),
+        top=Side(style='thin', color="000000"),
+        bottom=Side(style='thin', color="000000")
+    )
+    for col_idx, header in enumerate(headers, 1):
+        cell = ws.cell(row=1, column=col_idx, value=header)
+        cell.font = Font(bold=True, color="FFFFFF", size=11)
+        cell.fill = PatternFill(start_color="1E3C72", end_color="1E3C72", fill_type="solid")
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = header_border
+    
+    def summary_row(source_file, source_sheet, entry):
+        values = [source_file, source_sheet, entry['rows']]
+        for col in summary['numeric_columns']:
+            stats = entry['columns'][col]
+            values.extend([stats['sum'], stats['min'], stats['max'], stats['mean']])
+        values.append(sum(stats['nulls'] for stats in entry['columns'].values()))
+        return values
+    
+    rows = [summary_row(group['source_file'], group['source_sheet'], group) for group in summary['groups']]
+    rows.append(summary_row('Total', '', summary['totals']))
+    
+    for row_idx, values in enumerate(rows, 2):
+        for col_idx, value in enumerate(values, 1):
+            cell = ws.cell(row=row_idx, column=col_idx, value=value)
+            if isinstance(value, float):
+                cell.number_format = '#,##0.00'
+            elif isinstance(value, int):
+                cell.number_format = '#,##0'
+            if row_idx == len(rows) + 1:
+                cell.font = Font(bold=True)
+    
+    for col_idx, header in enumerate(headers, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max(len(str(header)) + 2, 12), 50)
+    
+    ws.freeze_panes = ws['A2']
+
+def create_output_excel(df, output_path, header_data_list, merged_cells_list, summary=None):
     """Create final Excel file with proper formatting"""
     try:
         wb = Workbook()
         ws = wb.active
         ws.title = "Merged_Data"
         
+        if summary:
+            write_summary_sheet(wb, summary)
+        
         if df.empty:
             wb.save(output_path)
             return True
@@ -598,21 +1445,459 @@ def create_output_excel(df, output_path, header_data_list, merged_cells_list):
         traceback.print_exc()
         return False
 
+def is_profile_admin():
+    """True if the request carries the profiling admin token"""
+    token = request.headers.get('X-Profile') or request.args.get('profile')
+    return bool(PROFILE_ADMIN_TOKEN and token and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN))
+
+def collapse_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+def sample_thread_stacks(thread_id, stop_event, samples):
+    """
+    Record the target thread's call stack every PROFILE_SAMPLE_INTERVAL seconds,
+    plus any parse_executor thread busy parsing a chunked upload, under a
+    [background parse] root. Those may belong to other requests' uploads, and
+    parses that finished before this request started are not captured.
+    """
+    while not stop_event.wait(PROFILE_SAMPLE_INTERVAL):
+        frames = sys._current_frames()
+        stack = collapse_stack(frames.get(thread_id))
+        if stack:
+            samples[stack] += 1
+        
+        for thread in threading.enumerate():
+            if thread.name.startswith(PARSE_THREAD_PREFIX) and thread.ident in frames:
+                stack = collapse_stack(frames[thread.ident])
+                # Idle workers sit in the executor's queue and are not worth a sample
+                if 'parse_uploaded_file' in stack:
+                    samples[f"[background parse];{stack}"] += 1
+
+def save_profile(profile_id, endpoint, samples, elapsed):
+    """Write collapsed stacks (flamegraph.pl / speedscope input) and a hotspot summary"""
+    total_samples = sum(samples.values())
+    self_counts = Counter()
+    total_counts = Counter()
+    for stack, count in samples.items():
+        frames = stack.split(';')
+        self_counts[frames[-1]] += count
+        for frame in set(frames):
+            total_counts[frame] += count
+    
+    def hotspots(counts):
+        return [{
+            'function': frame,
+            'samples': count,
+            'percent': round(100.0 * count / total_samples, 1) if total_samples else 0
+        } for frame, count in counts.most_common(PROFILE_TOP_N)]
+    
+    summary = {
+        'profile_id': profile_id,
+        'endpoint': endpoint,
+        'created_at': datetime.now().isoformat(),
+        'elapsed_seconds': round(elapsed, 3),
+        'sample_interval_ms': PROFILE_SAMPLE_INTERVAL * 1000,
+        'total_samples': total_samples,
+        'top_self': hotspots(self_counts),
+        'top_total': hotspots(total_counts)
+    }
+    
+    with open(os.path.join(PROFILE_FOLDER, f"{profile_id}.collapsed"), 'w') as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(os.path.join(PROFILE_FOLDER, f"{profile_id}.json"), 'w') as f:
+        json.dump(summary, f, indent=2)
+    
+    # Keep only the newest MAX_STORED_PROFILES profiles
+    stored = sorted((os.path.join(PROFILE_FOLDER, name) for name in os.listdir(PROFILE_FOLDER) if name.endswith('.json')),
+                    key=os.path.getmtime)
+    for path in stored[:-MAX_STORED_PROFILES]:
+        for stale in (path, path[:-len('.json')] + '.collapsed'):
+            try:
+                os.remove(stale)
+            except:
+                pass
+
+def profiled(view):
+    """Profile the wrapped view when an admin asks for it; otherwise call it directly"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not PROFILE_ADMIN_TOKEN or not is_profile_admin():
+            return view(*args, **kwargs)
+        
+        profile_id = str(uuid.uuid4())
+        samples = Counter()
+        stop_event = threading.Event()
+        sampler = threading.Thread(
+            target=sample_thread_stacks,
+            args=(threading.get_ident(), stop_event, samples),
+            daemon=True
+        )
+        start_time = time.time()
+        sampler.start()
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        finally:
+            stop_event.set()
+            sampler.join()
+            try:
+                save_profile(profile_id, request.path, samples, time.time() - start_time)
+            except Exception as e:
+                print(f"Error saving profile {profile_id}: {str(e)[:200]}")
+        
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+    return wrapper
+
+def file_content_hash(file):
+    """SHA-256 of an uploaded file, streamed so it is not read into memory at once"""
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.stream.read(1024 * 1024), b''):
+        digest.update(block)
+    file.stream.seek(0)
+    return digest.hexdigest()
+
+def upload_content_hash(upload):
+    """Content hash of a chunked upload, derived from its verified chunk checksums"""
+    checksums = ''.join(upload['received'][i] for i in range(upload['total_chunks']))
+    return hashlib.sha256(checksums.encode()).hexdigest()
+
+def merge_cache_key(inputs, options):
+    """Cache key for an ordered list of (filename, content hash) inputs and merge options"""
+    payload = json.dumps({
+        'version': MERGE_CACHE_VERSION,
+        'inputs': inputs,
+        'options': options
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def add_output_ref(path):
+    with merge_cache_lock:
+        output_refs[path] = output_refs.get(path, 0) + 1
+
+def release_output_ref(path):
+    """Drop one reference to an output file, deleting it when nothing uses it any more"""
+    with merge_cache_lock:
+        remaining = output_refs.get(path, 0) - 1
+        if remaining > 0:
+            output_refs[path] = remaining
+            return
+        output_refs.pop(path, None)
+    
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except:
+        pass
+
+def lookup_merge_cache(cache_key):
+    """Return a live cache entry for cache_key (counting the hit or miss), or None"""
+    expired = None
+    with merge_cache_lock:
+        entry = merge_cache.get(cache_key)
+        if entry and (time.time() - entry['cached_at'] > MERGE_CACHE_TTL or not os.path.exists(entry['path'])):
+            expired = merge_cache.pop(cache_key)
+            entry = None
+        
+        if entry:
+            merge_cache.move_to_end(cache_key)
+            merge_cache_stats['hits'] += 1
+        else:
+            merge_cache_stats['misses'] += 1
+    
+    if expired:
+        release_output_ref(expired['path'])
+    
+    return entry
+
+def store_merge_cache(cache_key, result):
+    """Keep a finished merge so identical requests can reuse its output file"""
+    entry = dict(result, cached_at=time.time())
+    add_output_ref(entry['path'])
+    
+    evicted = []
+    with merge_cache_lock:
+        if cache_key in merge_cache:
+            evicted.append(merge_cache.pop(cache_key))
+        merge_cache[cache_key] = entry
+        while len(merge_cache) > MERGE_CACHE_MAX_ENTRIES:
+            evicted.append(merge_cache.popitem(last=False)[1])
+    
+    for old_entry in evicted:
+        release_output_ref(old_entry['path'])
+
+def expire_merge_cache():
+    """Drop cache entries older than MERGE_CACHE_TTL; returns how many were removed"""
+    with merge_cache_lock:
+        expired = [key for key, entry in merge_cache.items()
+                   if time.time() - entry['cached_at'] > MERGE_CACHE_TTL]
+        entries = [merge_cache.pop(key) for key in expired]
+    
+    for entry in entries:
+        release_output_ref(entry['path'])
+    
+    return len(entries)
+
+def finish_merge(result):
+    """Register a merge result under a new download_id and build the /merge response"""
+    session_id = str(uuid.uuid4())
+    add_output_ref(result['path'])
+    
+    # Store file info
+    processed_files[session_id] = {
+        'filename': result['filename'],
+        'path': result['path'],
+        'created_at': datetime.now().isoformat(),
+        'stats': result['stats'],
+        'sheet_info': result['sheet_info'],
+        'join': result['join']
+    }
+    
+    # Update global statistics
+    today = datetime.now().strftime("%Y-%m-%d")
+    if global_stats["lastResetDate"] != today:
+        global_stats["todaySheetsMerged"] = 0
+        global_stats["lastResetDate"] = today
+    
+    global_stats["totalSheetsMerged"] += result['stats']['tables']
+    global_stats["todaySheetsMerged"] += result['stats']['tables']
+    
+    return jsonify({
+        'success': True,
+        'download_id': session_id,
+        'data': {
+            'consolidated': result['preview']
+        },
+        'stats': result['stats'],
+        'sheet_info': result['sheet_info'],
+        'join': result['join'],
+        'cached': result.get('cached', False)
+    })
+
+def load_static_asset(filename):
+    """
+    Return the content hash and identity/gzip/br variants of a static asset.
+    Variants are built at startup; this only recompresses a file edited since.
+    """
+    path = os.path.join(app.root_path, filename)
+    mtime = os.path.getmtime(path)
+    asset = static_asset_cache.get(filename)
+    if asset is not None and asset['mtime'] == mtime:
+        return asset
+    
+    # One thread compresses while concurrent requests for the same file wait for it
+    with static_asset_lock:
+        asset = static_asset_cache.get(filename)
+        if asset is not None and asset['mtime'] == mtime:
+            return asset
+        
+        with open(path, 'rb') as f:
+            raw = f.read()
+        
+        variants = {'identity': raw, 'gzip': gzip.compress(raw, compresslevel=9)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(raw, quality=11)
+        
+        asset = {
+            'mtime': mtime,
+            'version': hashlib.sha256(raw).hexdigest()[:12],
+            'mimetype': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+            'variants': variants
+        }
+        static_asset_cache[filename] = asset
+    
+    return asset
+
+def build_static_assets():
+    """Compress every static asset up front so no request pays for it"""
+    for filename in STATIC_ASSETS:
+        try:
+            load_static_asset(filename)
+        except Exception as e:
+            print(f"Error compressing static asset {filename}: {str(e)[:200]}")
+
+def send_static_asset(filename):
+    """Serve a static asset in the best encoding the client accepts, with validators"""
+    asset = load_static_asset(filename)
+    
+    encoding = 'identity'
+    for candidate in ('br', 'gzip'):
+        if candidate in asset['variants'] and request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+    
+    response = Response(asset['variants'][encoding], mimetype=asset['mimetype'])
+    if encoding != 'identity':
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{asset['version']}-{encoding}")
+    response.last_modified = asset['mtime']
+    
+    # Only URLs carrying the current content hash are safe to cache without revalidating
+    if request.args.get('v') == asset['version']:
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    
+    return response.make_conditional(request)
+
+def iter_output_csv(file_path):
+    """Stream the Merged_Data sheet of an output workbook as UTF-8 CSV chunks"""
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        ws = wb['Merged_Data'] if 'Merged_Data' in wb.sheetnames else wb.worksheets[0]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        for row in ws.iter_rows(values_only=True):
+            writer.writerow(['' if value is None else value for value in row])
+            if buffer.tell() >= CSV_STREAM_BUFFER:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    finally:
+        wb.close()
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@app.teardown_request
+def release_admitted_memory(exc):
+    cost = g.pop('merge_memory', None)
+    if cost is not None:
+        release_merge_memory(cost)
+
 @app.route('/')
 def index():
-    return send_from_directory('.', 'index.html')
+    # Point asset URLs at their content hash so browsers can cache them long-term
+    with open(os.path.join(app.root_path, 'index.html'), encoding='utf-8') as f:
+        html = f.read()
+    
+    for filename in STATIC_ASSETS:
+        html = html.replace(f'"{filename}"', f'"{filename}?v={load_static_asset(filename)["version"]}"')
+    
+    response = Response(html, mimetype='text/html')
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/merge', methods=['POST'])
+@profiled
 def merge_files():
     """API endpoint to merge uploaded files"""
     try:
-        if 'files' not in request.files:
+        files = request.files.getlist('files')
+        upload_ids = request.form.getlist('upload_ids')
+        
+        if 'files' not in request.files and not upload_ids:
             return jsonify({'error': 'No files uploaded', 'success': False}), 400
         
-        files = request.files.getlist('files')
-        if len(files) == 0:
+        if len(files) == 0 and not upload_ids:
             return jsonify({'error': 'No files selected', 'success': False}), 400
         
+        merge_mode = request.form.get('mode', 'stack').strip().lower()
+        join_type = request.form.get('join_type', 'inner').strip().lower()
+        join_keys = [key.strip() for value in request.form.getlist('join_keys')
+                     for key in value.split(',') if key.strip()]
+        
+        include_summary = request.form.get('summary', '').strip().lower() in ('1', 'true', 'yes', 'on')
+        
+        if merge_mode not in MERGE_MODES:
+            return jsonify({'error': f'Unknown merge mode {merge_mode}', 'success': False}), 400
+        
+        if merge_mode == 'join':
+            if join_type not in JOIN_TYPES:
+                return jsonify({'error': f'Unknown join type {join_type}. Use inner, left or outer.', 'success': False}), 400
+            if not join_keys:
+                return jsonify({'error': 'Join mode needs at least one key column', 'success': False}), 400
+        
+        # Resolve chunked uploads first; their parsing may already be running
+        chunked_uploads = []
+        with upload_lock:
+            for upload_id in upload_ids:
+                upload = upload_sessions.get(upload_id)
+                if not upload:
+                    return jsonify({'error': f'Upload {upload_id} not found or expired', 'success': False}), 400
+                if upload['status'] != 'complete' or upload['future'] is None:
+                    return jsonify({'error': f'Upload of {upload["filename"]} is not complete', 'success': False}), 400
+                chunked_uploads.append((upload_id, upload))
+        
+        # Large files arrive as chunked uploads; keep them where the user selected them
+        files = [file for file in files if file and file.filename]
+        input_order = merge_input_order(len(files), len(chunked_uploads), request.form.getlist('upload_positions'))
+        if input_order is None:
+            return jsonify({'error': 'upload_positions must give one distinct position per upload', 'success': False}), 400
+        
+        # Identical inputs and options reuse the output of an earlier merge
+        cache_inputs = []
+        for kind, i in input_order:
+            if kind == 'file':
+                cache_inputs.append([files[i].filename, file_content_hash(files[i])])
+            else:
+                cache_inputs.append([chunked_uploads[i][1]['filename'], upload_content_hash(chunked_uploads[i][1])])
+        cache_key = merge_cache_key(cache_inputs, {
+            'mode': merge_mode,
+            'join_type': join_type if merge_mode == 'join' else None,
+            'join_keys': join_keys if merge_mode == 'join' else [],
+            'summary': include_summary
+        })
+        
+        # Cache-Control: no-cache forces a fresh merge, no-store keeps it out of the cache
+        # (loadtest.py sends both so it measures real merges)
+        cached = None if request.cache_control.no_cache else lookup_merge_cache(cache_key)
+        if cached:
+            with upload_lock:
+                for upload_id, upload in chunked_uploads:
+                    upload['future'].cancel()
+                    upload_sessions.pop(upload_id, None)
+            print(f"Merge cache hit: {cached['filename']}")
+            return finish_merge(dict(cached, cached=True))
+        
+        # Wait for background parses first: they hold their own share of the budget
+        # until done, and would never get it back while this merge held its share.
+        # The wait holds a request thread, so it counts against the in-flight limit.
+        if chunked_uploads:
+            if not begin_parse_wait():
+                response = jsonify({'error': 'Server is busy with other merges. Please try again shortly.', 'success': False})
+                response.headers['Retry-After'] = str(ADMISSION_RETRY_AFTER)
+                return response, 429
+            try:
+                for upload_id, upload in chunked_uploads:
+                    try:
+                        upload['future'].result()
+                    except Exception:
+                        pass
+            finally:
+                end_parse_wait()
+        
+        # Hold the merge back until its estimated memory fits in the budget
+        file_sizes = [(file.filename, uploaded_file_size(file)) for file in files if file and file.filename]
+        file_sizes.extend((upload['filename'], upload['size']) for _, upload in chunked_uploads)
+        merge_memory = estimate_merge_memory(file_sizes)
+        
+        if not acquire_merge_memory(merge_memory):
+            response = jsonify({'error': 'Server is busy with other merges. Please try again shortly.', 'success': False})
+            response.headers['Retry-After'] = str(ADMISSION_RETRY_AFTER)
+            return response, 429
+        
+        # Released in release_admitted_memory once the request finishes
+        g.merge_memory = merge_memory
+        
         session_id = str(uuid.uuid4())
         
         all_sheets_data = []
@@ -620,9 +1905,10 @@ def merge_files():
         total_rows = 0
         total_columns = 0
         sheet_names_info = {}
+        extracted = {}
         
         # Process each file
-        for file in files:
+        for file_index, file in enumerate(files):
             if not file or file.filename == '':
                 continue
                 
@@ -636,46 +1922,7 @@ def merge_files():
             
             try:
                 print(f"Processing: {file.filename}")
-                
-                sheets_data = extract_file_data(temp_path, file.filename)
-                
-                if sheets_data:
-                    for sheet_data in sheets_data:
-                        sheet_name = sheet_data['sheet_name']
-                        key = f"{file.filename} - {sheet_name}"
-                        
-                        all_sheets_data.append(sheet_data)
-                        
-                        if key not in sheet_names_info:
-                            sheet_names_info[key] = {
-                                'filename': file.filename,
-                                'sheet_name': sheet_name,
-                                'table_count': 0,
-                                'row_count': 0,
-                                'column_count': 0
-                            }
-                        
-                        for table_data in sheet_data['tables']:
-                            total_tables += 1
-                            df = table_data.get('dataframe', pd.DataFrame())
-                            
-                            sheet_row_count = len(df)
-                            sheet_column_count = len(df.columns)
-                            
-                            total_rows += sheet_row_count
-                            total_columns = max(total_columns, sheet_column_count)
-                            
-                            sheet_names_info[key]['table_count'] += 1
-                            sheet_names_info[key]['row_count'] += sheet_row_count
-                            sheet_names_info[key]['column_count'] = max(
-                                sheet_names_info[key]['column_count'], 
-                                sheet_column_count
-                            )
-                    
-                    print(f"  Found {len(sheets_data)} sheets with {total_tables} tables")
-                else:
-                    print(f"  No data found in {file.filename}")
-                
+                extracted[('file', file_index)] = (file.filename, extract_file_data(temp_path, file.filename))
             except Exception as e:
                 print(f"Error processing {file.filename}: {str(e)[:200]}")
             finally:
@@ -686,14 +1933,74 @@ def merge_files():
                 except:
                     pass
         
+        # Collect chunked uploads parsed in the background
+        for upload_index, (upload_id, upload) in enumerate(chunked_uploads):
+            try:
+                extracted[('upload', upload_index)] = (upload['filename'], upload['future'].result())
+            except Exception as e:
+                print(f"Error processing {upload['filename']}: {str(e)[:200]}")
+            finally:
+                with upload_lock:
+                    upload_sessions.pop(upload_id, None)
+        
+        extracted_files = [extracted[slot] for slot in input_order if slot in extracted]
+        
+        for filename, sheets_data in extracted_files:
+            if sheets_data:
+                for sheet_data in sheets_data:
+                    sheet_name = sheet_data['sheet_name']
+                    key = f"{filename} - {sheet_name}"
+                    
+                    all_sheets_data.append(sheet_data)
+                    
+                    if key not in sheet_names_info:
+                        sheet_names_info[key] = {
+                            'filename': filename,
+                            'sheet_name': sheet_name,
+                            'table_count': 0,
+                            'row_count': 0,
+                            'column_count': 0,
+                            'engine': sheet_data.get('engine')
+                        }
+                    
+                    for table_data in sheet_data['tables']:
+                        total_tables += 1
+                        df = table_data.get('dataframe', pd.DataFrame())
+                        
+                        sheet_row_count = len(df)
+                        sheet_column_count = len(df.columns)
+                        
+                        total_rows += sheet_row_count
+                        total_columns = max(total_columns, sheet_column_count)
+                        
+                        sheet_names_info[key]['table_count'] += 1
+                        sheet_names_info[key]['row_count'] += sheet_row_count
+                        sheet_names_info[key]['column_count'] = max(
+                            sheet_names_info[key]['column_count'], 
+                            sheet_column_count
+                        )
+                
+                print(f"  {filename}: found {len(sheets_data)} sheets ({total_tables} tables so far)")
+            else:
+                print(f"  No data found in {filename}")
+        
+        file_count = len([f for f in files if f]) + len(chunked_uploads)
+        
         if not all_sheets_data:
             return jsonify({'error': 'No data found in uploaded files. Please ensure files contain data and are in supported formats (.xlsx, .xls, .xlsm, .csv).', 'success': False}), 400
         
         print(f"Total sheets found: {len(all_sheets_data)}")
         print(f"Total tables found: {total_tables}")
         
+        join_report = None
+        
         try:
-            consolidated_df, header_data_list, merged_cells_list, sheet_info = merge_all_data(all_sheets_data)
+            if merge_mode == 'join':
+                consolidated_df, join_report = join_all_data(all_sheets_data, join_keys, join_type)
+                header_data_list, merged_cells_list = [], []
+                print(f"Joined on {join_report['keys']} ({join_type})")
+            else:
+                consolidated_df, header_data_list, merged_cells_list, sheet_info = merge_all_data(all_sheets_data)
             
             if consolidated_df.empty:
                 return jsonify({'error': 'No data to merge after processing', 'success': False}), 400
@@ -716,62 +2023,283 @@ def merge_files():
                         row_list.append(val)
                 preview_data.append(row_list)
             
+            summary = compute_merge_summary(consolidated_df) if include_summary else None
+            
             # Save output file
             output_filename = f"merged_{session_id}.xlsx"
             output_path = os.path.join(UPLOAD_FOLDER, output_filename)
             
             success = create_output_excel(
-                consolidated_df, output_path, header_data_list, merged_cells_list
+                consolidated_df, output_path, header_data_list, merged_cells_list, summary
             )
             
             if not success:
                 return jsonify({'error': 'Failed to create output file', 'success': False}), 500
             
+        except JoinError as e:
+            return jsonify({'error': str(e), 'success': False}), 400
+        
         except Exception as e:
             print(f"Error in merge process: {str(e)[:200]}")
             traceback.print_exc()
             return jsonify({'error': f'Error merging data: {str(e)[:200]}', 'success': False}), 500
         
-        # Store file info
-        processed_files[session_id] = {
+        result = {
             'filename': output_filename,
             'path': output_path,
-            'created_at': datetime.now().isoformat(),
+            'preview': preview_data,
             'stats': {
                 'tables': total_tables,
                 'rows': len(consolidated_df),
                 'columns': len(consolidated_df.columns),
-                'files': len([f for f in files if f])
+                'files': file_count
             },
-            'sheet_info': sheet_names_info
+            'sheet_info': sheet_names_info,
+            'join': join_report
         }
+        if summary:
+            result['stats']['summary'] = summary
+        if not request.cache_control.no_store:
+            store_merge_cache(cache_key, result)
+        
+        return finish_merge(result)
+    
+    except Exception as e:
+        print(f"Error in merge endpoint: {str(e)[:200]}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)[:200], 'success': False}), 500
+
+@app.route('/inspect', methods=['POST'])
+def inspect_files():
+    """API endpoint to preview sheets, sizes and detected headers without a full merge"""
+    try:
+        if 'files' not in request.files:
+            return jsonify({'error': 'No files uploaded', 'success': False}), 400
+        
+        files = request.files.getlist('files')
+        if len(files) == 0:
+            return jsonify({'error': 'No files selected', 'success': False}), 400
+        
+        start_time = time.time()
+        results = []
+        
+        for file in files:
+            if not file or file.filename == '':
+                continue
+            
+            if not allowed_file(file.filename):
+                return jsonify({'error': f'File {file.filename} has invalid extension', 'success': False}), 400
+            
+            safe_filename = str(uuid.uuid4()) + "_" + file.filename
+            temp_path = os.path.join(app.config['UPLOAD_FOLDER'], safe_filename)
+            file.save(temp_path)
+            
+            try:
+                results.append({
+                    'filename': file.filename,
+                    'sheets': inspect_file(temp_path, file.filename)
+                })
+            except Exception as e:
+                print(f"Error inspecting {file.filename}: {str(e)[:200]}")
+                results.append({
+                    'filename': file.filename,
+                    'sheets': [],
+                    'error': f'Could not read file: {str(e)[:200]}'
+                })
+            finally:
+                try:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                except:
+                    pass
+        
+        return jsonify({
+            'success': True,
+            'files': results,
+            'elapsed_ms': round((time.time() - start_time) * 1000, 1)
+        })
+    
+    except Exception as e:
+        print(f"Error in inspect endpoint: {str(e)[:200]}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)[:200], 'success': False}), 500
 
-        # Update global statistics
-        today = datetime.now().strftime("%Y-%m-%d")
-        if global_stats["lastResetDate"] != today:
-            global_stats["todaySheetsMerged"] = 0
-            global_stats["lastResetDate"] = today
+@app.route('/upload/init', methods=['POST'])
+def upload_init():
+    """Start a resumable chunked upload for a single file"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        filename = os.path.basename(str(payload.get('filename') or '').replace('\\', '/')).strip()
+        
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': f'File {filename} has invalid extension', 'success': False}), 400
+        
+        try:
+            size = int(payload.get('size', 0))
+        except (TypeError, ValueError):
+            size = 0
+        
+        if size <= 0:
+            return jsonify({'error': 'File size must be greater than zero', 'success': False}), 400
+        
+        if size > MAX_CHUNKED_FILE_SIZE:
+            return jsonify({'error': 'File too large. Maximum size is 1GB.', 'success': False}), 413
+        
+        upload_id = str(uuid.uuid4())
+        total_chunks = (size + CHUNK_SIZE - 1) // CHUNK_SIZE
+        part_path = os.path.join(UPLOAD_FOLDER, f"{upload_id}.part")
+        
+        # Pre-size the file so chunks can be written at their offsets in any order
+        with open(part_path, 'wb') as f:
+            f.truncate(size)
+        
+        with upload_lock:
+            upload_sessions[upload_id] = {
+                'filename': filename,
+                'size': size,
+                'chunk_size': CHUNK_SIZE,
+                'total_chunks': total_chunks,
+                'part_path': part_path,
+                'received': {},
+                'status': 'uploading',
+                'future': None,
+                'updated_at': time.time()
+            }
+        
+        return jsonify({
+            'success': True,
+            'upload_id': upload_id,
+            'chunk_size': CHUNK_SIZE,
+            'total_chunks': total_chunks
+        })
+    
+    except Exception as e:
+        print(f"Error in upload init: {str(e)[:200]}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)[:200], 'success': False}), 500
 
-        global_stats["totalSheetsMerged"] += total_tables
-        global_stats["todaySheetsMerged"] += total_tables
+@app.route('/upload/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """Report which chunks have arrived so an interrupted upload can resume"""
+    with upload_lock:
+        upload = upload_sessions.get(upload_id)
+        if not upload:
+            return jsonify({'error': 'Upload not found or expired', 'success': False}), 404
+        
+        future = upload['future']
+        return jsonify({
+            'success': True,
+            'upload_id': upload_id,
+            'filename': upload['filename'],
+            'status': upload['status'],
+            'chunk_size': upload['chunk_size'],
+            'total_chunks': upload['total_chunks'],
+            'received_chunks': sorted(upload['received']),
+            'parsed': bool(future is not None and future.done())
+        })
 
+@app.route('/upload/<upload_id>/chunk/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Store one chunk after verifying its SHA-256 checksum"""
+    try:
+        with upload_lock:
+            upload = upload_sessions.get(upload_id)
+            if not upload:
+                return jsonify({'error': 'Upload not found or expired', 'success': False}), 404
+            if upload['status'] != 'uploading':
+                return jsonify({'error': 'Upload is already complete', 'success': False}), 409
+            chunk_size = upload['chunk_size']
+            total_chunks = upload['total_chunks']
+            size = upload['size']
+            part_path = upload['part_path']
+        
+        if index < 0 or index >= total_chunks:
+            return jsonify({'error': f'Chunk index {index} out of range', 'success': False}), 400
+        
+        expected_checksum = request.headers.get('X-Chunk-Checksum', '').strip().lower()
+        if not expected_checksum:
+            return jsonify({'error': 'Missing X-Chunk-Checksum header', 'success': False}), 400
+        
+        data = request.get_data(cache=False)
+        expected_length = min(chunk_size, size - index * chunk_size)
+        if len(data) != expected_length:
+            return jsonify({'error': f'Chunk {index} has {len(data)} bytes, expected {expected_length}', 'success': False}), 400
+        
+        checksum = hashlib.sha256(data).hexdigest()
+        if checksum != expected_checksum:
+            return jsonify({'error': f'Checksum mismatch for chunk {index}', 'success': False}), 400
+        
+        with open(part_path, 'r+b') as f:
+            f.seek(index * chunk_size)
+            f.write(data)
+        
+        with upload_lock:
+            upload['received'][index] = checksum
+            upload['updated_at'] = time.time()
+            received_count = len(upload['received'])
+        
         return jsonify({
             'success': True,
-            'download_id': session_id,
-            'data': {
-                'consolidated': preview_data
-            },
-            'stats': {
-                'tables': total_tables,
-                'rows': len(consolidated_df),
-                'columns': len(consolidated_df.columns),
-                'files': len([f for f in files if f])
-            },
-            'sheet_info': sheet_names_info
+            'index': index,
+            'checksum': checksum,
+            'received': received_count,
+            'total_chunks': total_chunks
         })
     
     except Exception as e:
-        print(f"Error in merge endpoint: {str(e)[:200]}")
+        print(f"Error in upload chunk: {str(e)[:200]}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)[:200], 'success': False}), 500
+
+@app.route('/upload/<upload_id>/complete', methods=['POST'])
+def upload_complete(upload_id):
+    """Assemble a fully received upload and start parsing it in the background"""
+    try:
+        with upload_lock:
+            upload = upload_sessions.get(upload_id)
+            if not upload:
+                return jsonify({'error': 'Upload not found or expired', 'success': False}), 404
+            
+            if upload['status'] == 'complete':
+                return jsonify({'success': True, 'upload_id': upload_id, 'filename': upload['filename']})
+            
+            if upload['status'] == 'completing':
+                return jsonify({'error': 'Upload is already being completed', 'success': False}), 409
+            
+            missing = [i for i in range(upload['total_chunks']) if i not in upload['received']]
+            if missing:
+                return jsonify({
+                    'error': f'{len(missing)} chunk(s) still missing',
+                    'missing_chunks': missing[:100],
+                    'success': False
+                }), 400
+            
+            # Blocks chunk PUTs and concurrent completes while the file is assembled
+            upload['status'] = 'completing'
+            upload['updated_at'] = time.time()
+        
+        extension = upload['filename'].rsplit('.', 1)[1].lower()
+        file_path = os.path.join(UPLOAD_FOLDER, f"{upload_id}.{extension}")
+        
+        try:
+            os.replace(upload['part_path'], file_path)
+            # Retries and cleanup must find the file where it now lives
+            upload['part_path'] = file_path
+            future = parse_executor.submit(parse_uploaded_file, file_path, upload['filename'])
+        except Exception:
+            # Leave the session retryable instead of stuck as complete without a parse
+            with upload_lock:
+                upload['status'] = 'uploading'
+            raise
+        
+        with upload_lock:
+            upload['future'] = future
+            upload['status'] = 'complete'
+        
+        return jsonify({'success': True, 'upload_id': upload_id, 'filename': upload['filename']})
+    
+    except Exception as e:
+        print(f"Error in upload complete: {str(e)[:200]}")
         traceback.print_exc()
         return jsonify({'error': str(e)[:200], 'success': False}), 500
 
@@ -788,11 +2316,28 @@ def download_file(session_id):
         if not os.path.exists(file_path):
             return jsonify({'error': 'File not found', 'success': False}), 404
         
+        download_stem = f"Merged_Excel_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        # CSV is converted from the workbook as it streams, gzipped when the client accepts it
+        if request.args.get('format') == 'csv':
+            chunks = iter_output_csv(file_path)
+            response = Response(mimetype='text/csv')
+            if request.accept_encodings['gzip']:
+                chunks = gzip_stream(chunks)
+                response.content_encoding = 'gzip'
+            response.response = chunks
+            response.vary.add('Accept-Encoding')
+            response.headers['Content-Disposition'] = f'attachment; filename="{download_stem}.csv"'
+            return response
+        
+        # send_file answers If-None-Match/If-Modified-Since with 304 and Range with 206
         return send_file(
             file_path,
             as_attachment=True,
-            download_name=f"Merged_Excel_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            download_name=f"{download_stem}.xlsx",
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            conditional=True,
+            etag=True
         )
     
     except Exception as e:
@@ -807,21 +2352,31 @@ def cleanup():
         cutoff_time = datetime.now().timestamp() - 3600
         cleaned_count = 0
         
+        # Outputs can be shared through the merge cache, so sessions expire by their
+        # own age and only release their reference to the file
         for session_id, file_info in list(processed_files.items()):
-            file_path = file_info['path']
-            if os.path.exists(file_path):
-                file_age = datetime.now().timestamp() - os.path.getmtime(file_path)
-                if file_age > 3600:
+            session_age = datetime.now().timestamp() - datetime.fromisoformat(file_info['created_at']).timestamp()
+            if session_age > 3600:
+                del processed_files[session_id]
+                release_output_ref(file_info['path'])
+                cleaned_count += 1
+        
+        cleaned_count += expire_merge_cache()
+        
+        with upload_lock:
+            for upload_id, upload in list(upload_sessions.items()):
+                if time.time() - upload['updated_at'] > UPLOAD_SESSION_TTL:
                     try:
-                        os.remove(file_path)
+                        if os.path.exists(upload['part_path']):
+                            os.remove(upload['part_path'])
                     except:
                         pass
-                    del processed_files[session_id]
+                    del upload_sessions[upload_id]
                     cleaned_count += 1
         
         for filename in os.listdir(UPLOAD_FOLDER):
             file_path = os.path.join(UPLOAD_FOLDER, filename)
-            if os.path.isfile(file_path):
+            if os.path.isfile(file_path) and file_path not in output_refs:
                 file_age = datetime.now().timestamp() - os.path.getmtime(file_path)
                 if file_age > 3600:
                     try:
@@ -836,9 +2391,41 @@ def cleanup():
         traceback.print_exc()
         return jsonify({'error': str(e)[:200], 'success': False}), 500
 
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """Fetch a stored profile: hotspot summary (JSON) or ?format=collapsed for flamegraphs"""
+    if not is_profile_admin():
+        return jsonify({'error': 'Forbidden', 'success': False}), 403
+    
+    try:
+        profile_id = str(uuid.UUID(profile_id))
+    except ValueError:
+        return jsonify({'error': 'Profile not found', 'success': False}), 404
+    
+    if request.args.get('format') == 'collapsed':
+        path = os.path.join(PROFILE_FOLDER, f"{profile_id}.collapsed")
+        mimetype = 'text/plain'
+    else:
+        path = os.path.join(PROFILE_FOLDER, f"{profile_id}.json")
+        mimetype = 'application/json'
+    
+    if not os.path.exists(path):
+        return jsonify({'error': 'Profile not found', 'success': False}), 404
+    
+    return send_file(path, mimetype=mimetype)
+
 @app.route('/stats', methods=['GET'])
 def get_stats():
-    return jsonify(global_stats)
+    lookups = merge_cache_stats['hits'] + merge_cache_stats['misses']
+    return jsonify({
+        **global_stats,
+        'mergeCache': {
+            'hits': merge_cache_stats['hits'],
+            'misses': merge_cache_stats['misses'],
+            'hitRate': round(merge_cache_stats['hits'] / lookups, 4) if lookups else 0,
+            'entries': len(merge_cache)
+        }
+    })
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -846,16 +2433,36 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'processed_files': len(processed_files)
+        'processed_files': len(processed_files),
+        'admission': {
+            'memory_budget_mb': round(MERGE_MEMORY_BUDGET / (1024 * 1024), 1),
+            'memory_in_use_mb': round(admission_state['memory_in_use'] / (1024 * 1024), 1),
+            'active_merges': admission_state['active'],
+            'queued_merges': admission_state['queued'],
+            'merges_awaiting_parse': admission_state['awaiting_parse'],
+            'max_merges_in_flight': ADMISSION_MAX_IN_FLIGHT,
+            'background_parses': admission_state['parsing']
+        }
     })
 
 @app.route('/style.css')
 def serve_css():
-    return send_from_directory('.', 'style.css')
+    return send_static_asset('style.css')
 
 @app.route('/script.js')
 def serve_js():
-    return send_from_directory('.', 'script.js')
+    return send_static_asset('script.js')
+
+@app.route('/bootstrp.min.css')
+def serve_bootstrap_css():
+    return send_static_asset('bootstrp.min.css')
+
+@app.route('/bootstrap.min.js')
+def serve_bootstrap_js():
+    return send_static_asset('bootstrap.min.js')
+
+# Each worker builds the compressed asset variants once when it imports the app
+build_static_assets()
 
 if __name__ == '__main__':
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -4,3 +4,9 @@ keepalive = 5
 worker_class = "sync"
 workers = 1
 threads = 4
+
+def post_worker_init(worker):
+    # Size merge admission to this worker's real thread count, which --threads
+    # or GUNICORN_CMD_ARGS may have changed from the value above
+    import app
+    app.set_worker_threads(worker.cfg.threads)
@@ -0,0 +1,322 @@
+"""
+Concurrent load test for the Excel merge tool.
+
+Starts the app locally under gunicorn for each worker configuration, fires a
+weighted mix of /merge, /download, /stats and /health requests from many
+concurrent clients using generated workbooks, and reports throughput,
+p50/p95/p99 latency, error rates and peak RSS per worker. Merges bypass the
+server's result cache unless --use-cache is given, since every request posts
+the same workbooks and would otherwise only measure cache hits.
+Each worker sizes its merge admission limit (threads - 2 merges in flight) to
+the --threads it was started with, via gunicorn.conf.py's post_worker_init.
+
+Example:
+    python loadtest.py --configs sync:1:4,gthread:2:4 --concurrency 20 --requests 200
+"""
+import os
+import sys
+import time
+import uuid
+import json
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = 'merge=4,download=2,stats=2,health=2'
+
+def parse_mix(mix):
+    """Parse 'merge=4,download=2' into {'merge': 4, 'download': 2}"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('merge', 'download', 'stats', 'health'):
+            raise ValueError(f"Unknown request type in mix: {name}")
+        weights[name] = int(weight or 1)
+    return weights
+
+def parse_config(config):
+    """Parse 'worker_class:workers:threads', e.g. 'sync:1:4'"""
+    worker_class, workers, threads = config.split(':')
+    return {'worker_class': worker_class, 'workers': int(workers), 'threads': int(threads)}
+
+def generate_workbooks(folder, file_count, rows):
+    """Write file_count workbooks with rows rows each, shaped like typical uploads"""
+    paths = []
+    rng = np.random.default_rng(42)
+    for i in range(file_count):
+        df = pd.DataFrame({
+            'Employee Code': [f"E{n:06d}" for n in range(rows)],
+            'Name': [f"Employee {n}" for n in range(rows)],
+            'Date': pd.date_range('2024-01-01', periods=rows, freq='h').strftime('%Y-%m-%d'),
+            'Hours': rng.integers(0, 10, rows),
+            'Amount': rng.normal(1000, 250, rows).round(2),
+            'Remarks': rng.choice(['', 'late', 'leave', 'overtime'], rows)
+        })
+        path = os.path.join(folder, f"loadtest_{i + 1}.xlsx")
+        df.to_excel(path, index=False, sheet_name=f"Sheet_{i + 1}")
+        paths.append(path)
+    return paths
+
+def build_multipart(paths):
+    """Encode files as a multipart/form-data body for /merge"""
+    boundary = uuid.uuid4().hex
+    body = bytearray()
+    for path in paths:
+        body += f"--{boundary}\r\n".encode()
+        body += f'Content-Disposition: form-data; name="files"; filename="{os.path.basename(path)}"\r\n'.encode()
+        body += b"Content-Type: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet\r\n\r\n"
+        with open(path, 'rb') as f:
+            body += f.read()
+        body += b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return bytes(body), f"multipart/form-data; boundary={boundary}"
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(config, port, workdir):
+    """Start gunicorn with the repo's config, overriding the worker settings"""
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app:app',
+        '-c', os.path.join(APP_DIR, 'gunicorn.conf.py'),
+        '--pythonpath', APP_DIR,
+        '-b', f"127.0.0.1:{port}",
+        '-k', config['worker_class'],
+        '--workers', str(config['workers']),
+        '--threads', str(config['threads'])
+    ]
+    server = subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return server
+        except Exception:
+            if server.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            time.sleep(0.2)
+    
+    server.terminate()
+    raise RuntimeError('gunicorn did not become healthy within 30s')
+
+def worker_pids(master_pid):
+    """PIDs of gunicorn workers (children of the master), read from /proc"""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent pid; the command name may contain spaces
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[1]) == master_pid:
+                pids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return pids
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def monitor_rss(master_pid, stop_event, peaks):
+    """Track peak RSS per worker pid until stop_event is set"""
+    while not stop_event.wait(0.2):
+        for pid in worker_pids(master_pid):
+            peaks[pid] = max(peaks.get(pid, 0.0), rss_mb(pid))
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class LoadClient:
+    """Issues requests against one server and records (kind, latency, status) results"""
+    
+    def __init__(self, base_url, merge_body, merge_content_type, timeout, use_cache=False):
+        self.base_url = base_url
+        self.merge_body = merge_body
+        self.merge_headers = {'Content-Type': merge_content_type}
+        if not use_cache:
+            self.merge_headers['Cache-Control'] = 'no-cache, no-store'
+        self.timeout = timeout
+        self.download_ids = []
+        self.lock = threading.Lock()
+        self.results = []
+    
+    def request(self, kind):
+        if kind == 'merge':
+            req = urllib.request.Request(self.base_url + '/merge', data=self.merge_body, method='POST',
+                                         headers=self.merge_headers)
+        elif kind == 'download':
+            with self.lock:
+                download_id = random.choice(self.download_ids) if self.download_ids else None
+            if download_id is None:
+                kind, req = 'health', urllib.request.Request(self.base_url + '/health')
+            else:
+                req = urllib.request.Request(self.base_url + '/download/' + download_id)
+        else:
+            req = urllib.request.Request(self.base_url + '/' + kind)
+        
+        start = time.perf_counter()
+        status = 0
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status = response.status
+                payload = response.read()
+            if kind == 'merge':
+                download_id = json.loads(payload).get('download_id')
+                if download_id:
+                    with self.lock:
+                        self.download_ids.append(download_id)
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except Exception:
+            status = 0
+        latency = time.perf_counter() - start
+        
+        with self.lock:
+            self.results.append((kind, latency, status))
+
+def run_config(config, args, paths):
+    """Run the request mix against one worker configuration and return its report"""
+    workdir = tempfile.mkdtemp(prefix='loadtest_')
+    port = free_port()
+    server = start_server(config, port, workdir)
+    
+    merge_body, content_type = build_multipart(paths)
+    client = LoadClient(f"http://127.0.0.1:{port}", merge_body, content_type, args.timeout, args.use_cache)
+    
+    weights = parse_mix(args.mix)
+    kinds = random.Random(args.seed).choices(list(weights), weights=list(weights.values()), k=args.requests)
+    
+    # One merge up front so downloads have something to fetch
+    client.request('merge')
+    client.results.clear()
+    
+    peaks = {}
+    stop_event = threading.Event()
+    monitor = threading.Thread(target=monitor_rss, args=(server.pid, stop_event, peaks), daemon=True)
+    monitor.start()
+    
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(client.request, kinds))
+    finally:
+        elapsed = time.perf_counter() - start
+        stop_event.set()
+        monitor.join()
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    by_kind = {}
+    for kind, latency, status in client.results:
+        by_kind.setdefault(kind, []).append((latency, status))
+    
+    endpoints = {}
+    for kind, entries in sorted(by_kind.items()):
+        latencies = sorted(latency for latency, _ in entries)
+        errors = sum(1 for _, status in entries if status < 200 or status >= 400)
+        endpoints[kind] = {
+            'requests': len(entries),
+            'error_rate': round(errors / len(entries), 4),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+        }
+    
+    all_latencies = sorted(latency for _, latency, _ in client.results)
+    total_errors = sum(1 for _, _, status in client.results if status < 200 or status >= 400)
+    
+    return {
+        'config': f"{config['worker_class']}:{config['workers']}:{config['threads']}",
+        'requests': len(client.results),
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_rps': round(len(client.results) / elapsed, 2) if elapsed else 0,
+        'error_rate': round(total_errors / len(client.results), 4) if client.results else 0,
+        'p50_ms': round(percentile(all_latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(all_latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(all_latencies, 99) * 1000, 1),
+        'peak_rss_mb_per_worker': round(max(peaks.values()), 1) if peaks else 0,
+        'peak_rss_mb_total': round(sum(peaks.values()), 1),
+        'endpoints': endpoints
+    }
+
+def print_report(reports):
+    print("=" * 70)
+    print("LOAD TEST RESULTS")
+    print("=" * 70)
+    print(f"{'config':<16}{'req/s':>8}{'err%':>7}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}{'rss/wkr':>10}")
+    for report in reports:
+        print(f"{report['config']:<16}{report['throughput_rps']:>8}{report['error_rate'] * 100:>7.1f}"
+              f"{report['p50_ms']:>9}{report['p95_ms']:>9}{report['p99_ms']:>9}{report['peak_rss_mb_per_worker']:>10}")
+        for kind, stats in report['endpoints'].items():
+            print(f"  {kind:<14}{stats['requests']:>8}{stats['error_rate'] * 100:>7.1f}"
+                  f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+    print("=" * 70)
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent load test for the Excel merge tool')
+    parser.add_argument('--configs', default='sync:1:4',
+                        help='Comma-separated worker_class:workers:threads configurations (default: sync:1:4)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Request weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients (default: 20)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per configuration (default: 200)')
+    parser.add_argument('--files', type=int, default=3, help='Workbooks per /merge request (default: 3)')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per generated workbook (default: 2000)')
+    parser.add_argument('--timeout', type=float, default=600, help='Per-request timeout in seconds (default: 600)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the request order (default: 1)')
+    parser.add_argument('--use-cache', action='store_true',
+                        help='Let repeated merges hit the server result cache (default: bypass it)')
+    parser.add_argument('--json', dest='json_path', help='Also write the reports to this JSON file')
+    args = parser.parse_args()
+    
+    configs = [parse_config(config) for config in args.configs.split(',')]
+    
+    data_dir = tempfile.mkdtemp(prefix='loadtest_data_')
+    try:
+        paths = generate_workbooks(data_dir, args.files, args.rows)
+        reports = []
+        for config in configs:
+            print(f"Running {args.requests} requests with {args.concurrency} clients against "
+                  f"{config['worker_class']} workers={config['workers']} threads={config['threads']}...")
+            reports.append(run_config(config, args, paths))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    
+    print_report(reports)
+    
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -52,6 +52,11 @@ const currentDate = document.getElementById('currentDate');
 // ✅ Use your new custom domain
 const API_BASE_URL = 'https://excel-sheet-consolidator.relievv.in';
 
+// Files above this size go through the resumable chunked upload API
+const CHUNKED_UPLOAD_THRESHOLD = 20 * 1024 * 1024; // 20MB
+const CHUNK_MAX_RETRIES = 3;
+const DOWNLOAD_MAX_RETRIES = 3;
+
 // Initialize
 function init() {
     loadUserData();
@@ -278,10 +283,40 @@ async function mergeFiles() {
     previewInfo.textContent = 'Processing ' + selectedFiles.length + ' file(s)...';
     
     try {
+        // Large files are uploaded in chunks first; the server starts parsing
+        // each one as soon as it completes, while the rest are still uploading
+        const largeFiles = selectedFiles.filter(file => file.size > CHUNKED_UPLOAD_THRESHOLD);
+        const uploadIds = [];
+        const uploadPositions = [];
+        
+        if (largeFiles.length > 0) {
+            const totalBytes = largeFiles.reduce((sum, file) => sum + file.size, 0);
+            let uploadedBytes = 0;
+            
+            for (const file of largeFiles) {
+                previewInfo.textContent = 'Uploading ' + file.name + '...';
+                const uploadId = await uploadFileInChunks(file, (bytes) => {
+                    uploadedBytes += bytes;
+                    progressFill.style.width = (10 + Math.round((uploadedBytes / totalBytes) * 20)) + '%';
+                });
+                uploadIds.push(uploadId);
+                uploadPositions.push(selectedFiles.indexOf(file));
+            }
+            
+            previewInfo.textContent = 'Processing ' + selectedFiles.length + ' file(s)...';
+        }
+        
         // Create FormData to send files to Python backend
         const formData = new FormData();
         selectedFiles.forEach((file, index) => {
-            formData.append('files', file);
+            if (file.size <= CHUNKED_UPLOAD_THRESHOLD) {
+                formData.append('files', file);
+            }
+        });
+        // Positions keep large files where they were selected in the merged order
+        uploadIds.forEach((uploadId, i) => {
+            formData.append('upload_ids', uploadId);
+            formData.append('upload_positions', uploadPositions[i]);
         });
         
         // Send to Python backend
@@ -315,6 +350,9 @@ async function mergeFiles() {
         processingStats = result.stats;
         sheetInfo = result.sheet_info || {};
         
+        // Consumed uploads cannot be reused, so forget their resume state
+        largeFiles.forEach(file => localStorage.removeItem(chunkedUploadKey(file)));
+        
         // Calculate processing time
         mergeEndTime = Date.now();
         
@@ -354,6 +392,102 @@ async function mergeFiles() {
     }
 }
 
+// Key used to remember an unfinished chunked upload across retries
+function chunkedUploadKey(file) {
+    return 'chunkedUpload:' + file.name + ':' + file.size + ':' + file.lastModified;
+}
+
+async function sha256Hex(blob) {
+    const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// Upload a file through the chunked upload API, resuming a previous attempt if
+// the server still has it. Returns the upload_id to pass to /merge.
+async function uploadFileInChunks(file, onProgress) {
+    const storageKey = chunkedUploadKey(file);
+    let upload = null;
+    let receivedChunks = new Set();
+    
+    const previousId = localStorage.getItem(storageKey);
+    if (previousId) {
+        try {
+            const res = await fetch(API_BASE_URL + '/upload/' + previousId);
+            if (res.ok) {
+                const status = await res.json();
+                upload = {
+                    upload_id: previousId,
+                    chunk_size: status.chunk_size,
+                    total_chunks: status.total_chunks
+                };
+                if (status.status === 'complete') {
+                    onProgress(file.size);
+                    return previousId;
+                }
+                receivedChunks = new Set(status.received_chunks);
+            }
+        } catch (e) {
+            console.log('Resume check failed', e);
+        }
+    }
+    
+    if (!upload) {
+        const res = await fetch(API_BASE_URL + '/upload/init', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size })
+        });
+        upload = await res.json();
+        if (!res.ok || !upload.success) {
+            throw new Error(upload.error || 'Could not start upload of ' + file.name);
+        }
+        localStorage.setItem(storageKey, upload.upload_id);
+    }
+    
+    for (let index = 0; index < upload.total_chunks; index++) {
+        const start = index * upload.chunk_size;
+        const chunk = file.slice(start, Math.min(start + upload.chunk_size, file.size));
+        
+        if (!receivedChunks.has(index)) {
+            const checksum = await sha256Hex(chunk);
+            let lastError = null;
+            
+            for (let attempt = 0; attempt < CHUNK_MAX_RETRIES; attempt++) {
+                try {
+                    const res = await fetch(API_BASE_URL + '/upload/' + upload.upload_id + '/chunk/' + index, {
+                        method: 'PUT',
+                        headers: { 'X-Chunk-Checksum': checksum },
+                        body: chunk
+                    });
+                    if (res.ok) {
+                        lastError = null;
+                        break;
+                    }
+                    const errorData = await res.json();
+                    lastError = new Error(errorData.error || 'Chunk upload failed');
+                } catch (e) {
+                    lastError = e;
+                }
+                await new Promise(resolve => setTimeout(resolve, 1000 * (attempt + 1)));
+            }
+            
+            if (lastError) {
+                throw lastError;
+            }
+        }
+        
+        onProgress(chunk.size);
+    }
+    
+    const res = await fetch(API_BASE_URL + '/upload/' + upload.upload_id + '/complete', { method: 'POST' });
+    const result = await res.json();
+    if (!res.ok || !result.success) {
+        throw new Error(result.error || 'Could not complete upload of ' + file.name);
+    }
+    
+    return upload.upload_id;
+}
+
 function updateSheetDropdown() {
     sheetSelect.innerHTML = '';
     
@@ -670,6 +804,59 @@ function calculateAccurateFileSize() {
     return Math.max(10, (totalDataSize + excelOverhead) / 1024); // Return in KB, minimum 10KB
 }
 
+// Fetch a file, continuing from the last received byte (Range + If-Range) after a network error
+async function fetchWithResume(url) {
+    const chunks = [];
+    let received = 0;
+    let etag = null;
+    let contentType = 'application/octet-stream';
+    
+    for (let attempt = 0; attempt < DOWNLOAD_MAX_RETRIES; attempt++) {
+        const headers = {};
+        if (received > 0 && etag) {
+            headers['Range'] = 'bytes=' + received + '-';
+            headers['If-Range'] = etag;
+        }
+        
+        let response;
+        try {
+            response = await fetch(url, { headers });
+        } catch (e) {
+            if (attempt === DOWNLOAD_MAX_RETRIES - 1) throw e;
+            await new Promise(resolve => setTimeout(resolve, 1000 * (attempt + 1)));
+            continue;
+        }
+        
+        if (!response.ok) {
+            throw new Error('Download failed');
+        }
+        
+        // A full response means the file changed or the range was ignored, so start over
+        if (response.status !== 206) {
+            chunks.length = 0;
+            received = 0;
+        }
+        etag = response.headers.get('ETag') || etag;
+        contentType = response.headers.get('Content-Type') || contentType;
+        
+        try {
+            const reader = response.body.getReader();
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                chunks.push(value);
+                received += value.length;
+            }
+            return new Blob(chunks, { type: contentType });
+        } catch (e) {
+            if (attempt === DOWNLOAD_MAX_RETRIES - 1) throw e;
+            await new Promise(resolve => setTimeout(resolve, 1000 * (attempt + 1)));
+        }
+    }
+    
+    throw new Error('Download failed');
+}
+
 async function downloadMergedFile() {
     if (!sessionId) {
         showNotification('No merged file available for download.', 'error');
@@ -681,14 +868,8 @@ async function downloadMergedFile() {
         confirmDownload.innerHTML = '<div class="loading"></div> Downloading...';
         confirmDownload.disabled = true;
         
-        // Download the merged file from Python backend
-        const response = await fetch(API_BASE_URL + '/download/' + sessionId);
-        
-        if (!response.ok) {
-            throw new Error('Download failed');
-        }
-        
-        const blob = await response.blob();
+        // Download the merged file from Python backend, resuming if the connection drops
+        const blob = await fetchWithResume(API_BASE_URL + '/download/' + sessionId);
         const actualSizeKB = blob.size / 1024;
         
         // Store actual file size for future reference
@@ -0,0 +1,30 @@
+import os
+import sys
+from collections import OrderedDict
+
+import pytest
+
+# The app is a single top-level module, importable from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+
+
+@pytest.fixture
+def upload_folder(tmp_path, monkeypatch):
+    """Send uploads and merge outputs to a temp dir and start from empty server state"""
+    folder = tmp_path / 'uploads'
+    folder.mkdir()
+    monkeypatch.setattr(app_module, 'UPLOAD_FOLDER', str(folder))
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(folder))
+    monkeypatch.setattr(app_module, 'processed_files', {})
+    monkeypatch.setattr(app_module, 'upload_sessions', {})
+    monkeypatch.setattr(app_module, 'merge_cache', OrderedDict())
+    monkeypatch.setattr(app_module, 'output_refs', {})
+    monkeypatch.setattr(app_module, 'merge_cache_stats', {'hits': 0, 'misses': 0})
+    return str(folder)
+
+
+@pytest.fixture
+def client(upload_folder):
+    return app_module.app.test_client()
@@ -0,0 +1,33 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def worker_threads():
+    original = app.WORKER_THREADS
+    yield app.set_worker_threads
+    app.set_worker_threads(original)
+
+
+def test_in_flight_limit_follows_worker_threads(worker_threads):
+    worker_threads(8)
+    assert app.ADMISSION_MAX_IN_FLIGHT == 6
+    worker_threads(1)
+    assert app.ADMISSION_MAX_IN_FLIGHT == 1
+
+
+def test_parse_waits_count_against_in_flight_limit(worker_threads):
+    worker_threads(4)
+    assert app.begin_parse_wait()
+    assert app.begin_parse_wait()
+    try:
+        assert not app.begin_parse_wait()
+        assert not app.acquire_merge_memory(app.MERGE_BASE_MEMORY)
+    finally:
+        app.end_parse_wait()
+        app.end_parse_wait()
+    
+    assert app.acquire_merge_memory(app.MERGE_BASE_MEMORY)
+    app.release_merge_memory(app.MERGE_BASE_MEMORY)
+    assert app.merges_in_flight() == 0
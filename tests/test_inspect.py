@@ -0,0 +1,67 @@
+from datetime import datetime, time
+
+import xlrd
+from openpyxl import Workbook, load_workbook
+
+import app
+
+
+def inspect_and_merge_columns(client, path, filename):
+    with open(path, 'rb') as f:
+        inspected = client.post('/inspect', data={'files': [(f, filename)]}, content_type='multipart/form-data')
+    with open(path, 'rb') as f:
+        merged = client.post('/merge', data={'files': [(f, filename)]}, content_type='multipart/form-data',
+                             headers={'Cache-Control': 'no-cache, no-store'})
+    
+    assert inspected.status_code == 200
+    assert merged.status_code == 200
+    sheet = inspected.get_json()['files'][0]['sheets'][0]
+    ws = load_workbook(app.processed_files[merged.get_json()['download_id']]['path'])['Merged_Data']
+    header = [cell for cell in next(ws.iter_rows(max_row=1, values_only=True))]
+    return sheet['columns'], [col for col in header if col not in ('Source_File', 'Source_Sheet')]
+
+
+def save_sheet(path, rows):
+    wb = Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def test_na_strings_in_header(client, tmp_path):
+    path = tmp_path / 'na.xlsx'
+    save_sheet(path, [['Code', 'NA', 'Amount', 'Code']] + [[f'E{i}', f'N{i}', i, f'C{i}'] for i in range(5)])
+    
+    inspected, merged = inspect_and_merge_columns(client, path, 'na.xlsx')
+    
+    assert inspected == merged
+
+
+def test_column_with_data_after_sample(client, tmp_path):
+    path = tmp_path / 'late.xlsx'
+    rows = [['Code', None, 'Name', 'Amount']]
+    rows += [[f'C{i}', f'x{i}' if i >= app.INSPECT_SAMPLE_ROWS + 10 else None, f'n{i}', i] for i in range(80)]
+    save_sheet(path, rows)
+    
+    inspected, merged = inspect_and_merge_columns(client, path, 'late.xlsx')
+    
+    assert inspected == merged == ['Code', 'Column_2', 'Name', 'Amount']
+
+
+def test_numeric_and_date_headers(client, tmp_path):
+    path = tmp_path / 'years.xlsx'
+    save_sheet(path, [['Code', 2024, 2025.0, datetime(2024, 1, 1)]] + [[f'E{i}', 'a', 'b', 'c'] for i in range(3)])
+    
+    inspected, merged = inspect_and_merge_columns(client, path, 'years.xlsx')
+    
+    assert inspected == merged
+
+
+def test_xlrd_cells_match_pandas_conversion():
+    assert app.xlrd_cell_value(45292.0, xlrd.XL_CELL_DATE, 0) == datetime(2024, 1, 1)
+    assert app.xlrd_cell_value(0.5, xlrd.XL_CELL_DATE, 0) == time(12, 0)
+    assert app.xlrd_cell_value(1, xlrd.XL_CELL_BOOLEAN, 0) is True
+    assert app.xlrd_cell_value(42, xlrd.XL_CELL_ERROR, 0) is None
+    assert app.calamine_cell_to_str(app.xlrd_cell_value(2024.0, xlrd.XL_CELL_NUMBER, 0)) == '2024'
+
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+import app
+
+LEFT = pd.DataFrame({
+    'Code': ['c', 'a', '', 'z', 'b', 'a'],
+    'Name': ['C', 'A', 'Blank', 'Z', 'B', 'A2']
+})
+RIGHT = pd.DataFrame({
+    'Code': ['b', 'q', 'a', 'c', 'a', ' ', 'y'],
+    'Hours': ['1', '2', '3', '4', '5', '6', '7']
+})
+
+
+def reference_join(left, right, join_type):
+    """Nested-loop join in left order, then unmatched right rows in right order"""
+    def key(value):
+        return value.strip() or None
+    
+    rows = []
+    matched_right = set()
+    for _, left_row in left.iterrows():
+        matches = [i for i, right_row in right.iterrows()
+                   if key(left_row['Code']) is not None and key(left_row['Code']) == key(right_row['Code'])]
+        for i in matches:
+            matched_right.add(i)
+            rows.append([left_row['Code'], left_row['Name'], right.loc[i, 'Hours']])
+        if not matches and join_type in ('left', 'outer'):
+            rows.append([left_row['Code'], left_row['Name'], ''])
+    
+    if join_type == 'outer':
+        for i, right_row in right.iterrows():
+            if i not in matched_right:
+                rows.append([right_row['Code'], '', right_row['Hours']])
+    return rows
+
+
+@pytest.mark.parametrize('join_type', ['inner', 'left', 'outer'])
+@pytest.mark.parametrize('right_rows', [7, 3], ids=['left-indexed', 'right-indexed'])
+def test_join_matches_reference(join_type, right_rows):
+    right = RIGHT.iloc[:right_rows].reset_index(drop=True)
+    
+    joined, report = app.hash_join(LEFT, right, ['Code'], ['Code'], join_type)
+    
+    assert report['index_side'] == ('left' if len(LEFT) <= len(right) else 'right')
+    assert list(joined.columns) == ['Code', 'Name', 'Hours']
+    assert joined.values.tolist() == reference_join(LEFT, right, join_type)
+
+
+def test_join_report_counts():
+    joined, report = app.hash_join(LEFT, RIGHT, ['Code'], ['Code'], 'left')
+    
+    # a matches twice on each side: 2 x 2 rows, plus b and c once each
+    assert report['matched_rows'] == 6
+    # Blank keys never match: '' on the left, ' ' on the right
+    assert report['unmatched_left_rows'] == 2
+    assert report['unmatched_right_rows'] == 3
+    assert report['unmatched_left_keys'] == 1
+    assert report['unmatched_right_keys'] == 2
+
+
+def test_left_join_keeps_unmatched_lookups_blank(tmp_path):
+    emp = pd.DataFrame({'Employee Code': ['E1', 'E2', 'E3'], 'Name': ['A', 'B', 'C']})
+    att = pd.DataFrame({'Employee Code': ['E1', 'E3'], 'Hours': [7, 0]})
+    sheets = []
+    for name, df in (('emp.xlsx', emp), ('att.xlsx', att)):
+        path = tmp_path / name
+        df.to_excel(path, index=False)
+        sheets.extend(app.extract_file_data(str(path), name))
+    
+    joined, _ = app.join_all_data(sheets, ['Employee Code'], 'left')
+    
+    rows = joined[['Employee Code', 'Name', 'Hours']].values.tolist()
+    assert rows == [['E1', 'A', 7], ['E2', 'B', ''], ['E3', 'C', 0]]
+    assert isinstance(rows[0][2], int)
+
+
+def test_summary_of_join_skips_blank_lookups():
+    df = pd.DataFrame({
+        'Source_File': ['emp.xlsx'] * 3,
+        'Source_Sheet': ['Sheet1'] * 3,
+        'Hours': [7, '', 2.5]
+    })
+    
+    summary = app.compute_merge_summary(df)
+    
+    assert summary['numeric_columns'] == ['Hours']
+    assert summary['totals']['columns']['Hours'] == {'nulls': 1, 'sum': 9.5, 'min': 2.5, 'max': 7.0, 'mean': 4.75}
@@ -0,0 +1,101 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import app
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    def make(name, codes):
+        path = tmp_path / name
+        pd.DataFrame({'Code': codes, 'Amount': list(range(len(codes)))}).to_excel(path, index=False)
+        return path
+    return make
+
+
+def merge(client, path):
+    with open(path, 'rb') as f:
+        response = client.post('/merge', data={'files': [(f, os.path.basename(path))]}, content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def age_session(download_id):
+    app.processed_files[download_id]['created_at'] = (datetime.now() - timedelta(hours=2)).isoformat()
+
+
+def age_cache():
+    for entry in app.merge_cache.values():
+        entry['cached_at'] -= app.MERGE_CACHE_TTL + 1
+
+
+def cleanup(client):
+    assert client.post('/cleanup').status_code == 200
+
+
+def test_cache_hit_shares_output_file(client, workbook):
+    path = workbook('a.xlsx', ['A1', 'A2'])
+    
+    first = merge(client, path)
+    second = merge(client, path)
+    
+    assert (first['cached'], second['cached']) == (False, True)
+    output = app.processed_files[first['download_id']]['path']
+    assert app.processed_files[second['download_id']]['path'] == output
+    # The cache entry plus one reference per session
+    assert app.output_refs[output] == 3
+    assert app.merge_cache_stats == {'hits': 1, 'misses': 1}
+
+
+def test_cleanup_deletes_output_after_last_reference(client, workbook):
+    path = workbook('a.xlsx', ['A1', 'A2'])
+    first = merge(client, path)['download_id']
+    second = merge(client, path)['download_id']
+    output = app.processed_files[first]['path']
+    
+    age_session(first)
+    cleanup(client)
+    assert first not in app.processed_files
+    assert os.path.exists(output) and app.output_refs[output] == 2
+    
+    age_cache()
+    cleanup(client)
+    assert not app.merge_cache
+    assert os.path.exists(output) and app.output_refs[output] == 1
+    assert client.get(f'/download/{second}').status_code == 200
+    
+    age_session(second)
+    cleanup(client)
+    assert not os.path.exists(output)
+    assert output not in app.output_refs
+
+
+def test_evicted_entry_keeps_file_for_its_session(client, workbook, monkeypatch):
+    monkeypatch.setattr(app, 'MERGE_CACHE_MAX_ENTRIES', 1)
+    first = merge(client, workbook('a.xlsx', ['A1']))['download_id']
+    merge(client, workbook('b.xlsx', ['B1']))
+    output = app.processed_files[first]['path']
+    
+    assert [entry['path'] for entry in app.merge_cache.values()] != [output]
+    assert os.path.exists(output) and app.output_refs[output] == 1
+    
+    age_session(first)
+    cleanup(client)
+    assert not os.path.exists(output)
+
+
+def test_release_output_ref(upload_folder, tmp_path):
+    output = tmp_path / 'merged.xlsx'
+    output.write_bytes(b'data')
+    app.add_output_ref(str(output))
+    app.add_output_ref(str(output))
+    
+    app.release_output_ref(str(output))
+    assert output.exists()
+    
+    app.release_output_ref(str(output))
+    assert not output.exists()
+    assert str(output) not in app.output_refs
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import app
+
+pytestmark = pytest.mark.skipif(app.CalamineWorkbook is None, reason="python-calamine is not installed")
+
+
+def normalize(df):
+    """Cell values with every missing marker (None/NaN) as None"""
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    ws.append(['Report', None, None, None, None])
+    ws.append(['Code', 'NA', None, 'Amount', 'Code'])
+    ws.append(['a', 'N/A', 'x', 1, datetime(2024, 1, 31)])
+    ws.append(['NA', 'null', '#N/A', 2.5, None])
+    ws.append(['nan', 'None', 'NULL', 3.0, 'n/a'])
+    ws.append(['-NaN', ' NA ', '', 1e20, 'text'])
+    other = wb.create_sheet('Other')
+    other.append(['Name', 'Value'])
+    other.append(['b', 'NaN'])
+    path = tmp_path / 'parity.xlsx'
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize('header', [None, 0])
+def test_calamine_matches_openpyxl(workbook_path, header):
+    expected = app.read_sheets_openpyxl(workbook_path, header)
+    actual = app.read_sheets_calamine(workbook_path, header)
+    
+    assert list(actual) == list(expected)
+    for sheet_name in expected:
+        assert list(actual[sheet_name].columns) == list(expected[sheet_name].columns)
+        assert normalize(actual[sheet_name]) == normalize(expected[sheet_name])
+
+
+def test_merge_input_independent_of_engine(workbook_path, monkeypatch):
+    tables = {}
+    for engine in ('calamine', 'openpyxl'):
+        monkeypatch.setattr(app, 'READER_ENGINE', engine)
+        sheets = app.extract_file_data(workbook_path, 'parity.xlsx')
+        assert {sheet['engine'] for sheet in sheets} == {engine}
+        tables[engine] = [(sheet['sheet_name'], list(sheet['tables'][0]['data'].columns),
+                           normalize(sheet['tables'][0]['data'])) for sheet in sheets]
+    
+    assert tables['calamine'] == tables['openpyxl']
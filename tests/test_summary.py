@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+import app
+
+
+def test_summary_without_numeric_columns():
+    df = pd.DataFrame({
+        'Source_File': ['staff.xlsx', 'staff.xlsx', 'attendance.xlsx'],
+        'Source_Sheet': ['Employees', 'Employees', 'March'],
+        'Name': ['Asha', '', 'Ravi'],
+        'Status': ['', '', 'Present']
+    })
+    
+    summary = app.compute_merge_summary(df)
+    
+    assert summary['numeric_columns'] == []
+    assert [(group['source_file'], group['rows']) for group in summary['groups']] == [
+        ('staff.xlsx', 2), ('attendance.xlsx', 1)
+    ]
+    assert summary['groups'][0]['columns'] == {'Name': {'nulls': 1}, 'Status': {'nulls': 2}}
+    assert summary['totals'] == {'rows': 3, 'columns': {'Name': {'nulls': 1}, 'Status': {'nulls': 2}}}
+
+
+def test_summary_numeric_columns():
+    df = pd.DataFrame({
+        'Source_File': ['a.xlsx', 'a.xlsx', 'b.xlsx'],
+        'Source_Sheet': ['Sheet1', 'Sheet1', 'Sheet1'],
+        'Amount': [1.5, 2.5, 10.0],
+        'Note': ['x', '', 'y']
+    })
+    
+    summary = app.compute_merge_summary(df)
+    
+    assert summary['numeric_columns'] == ['Amount']
+    assert summary['groups'][0]['columns']['Amount'] == {'nulls': 0, 'sum': 4.0, 'min': 1.5, 'max': 2.5, 'mean': 2.0}
+    assert summary['totals']['columns']['Amount'] == {'nulls': 0, 'sum': 14.0, 'min': 1.5, 'max': 10.0, 'mean': 4.666667}
+    assert summary['totals']['columns']['Note'] == {'nulls': 1}
+
+
+def test_merge_summary_when_numeric_columns_stay_text(client, tmp_path):
+    # Each sheet's numeric column covers only half the merged rows, so the merge keeps them as text
+    employees = tmp_path / 'employees.xlsx'
+    attendance = tmp_path / 'attendance.xlsx'
+    pd.DataFrame({'Employee Code': ['E1', 'E2'], 'Name': ['Asha', 'Ravi'], 'Salary': [100, 200]}).to_excel(employees, index=False)
+    pd.DataFrame({'Employee Code': ['E1', 'E2'], 'Date': ['2024-03-01', '2024-03-01'], 'Hours': [8, 7]}).to_excel(attendance, index=False)
+    
+    with open(employees, 'rb') as f1, open(attendance, 'rb') as f2:
+        response = client.post('/merge', data={
+            'summary': 'true',
+            'files': [(f1, 'employees.xlsx'), (f2, 'attendance.xlsx')]
+        }, content_type='multipart/form-data', headers={'Cache-Control': 'no-cache, no-store'})
+    
+    assert response.status_code == 200
+    result = response.get_json()
+    summary = result['stats']['summary']
+    assert [group['rows'] for group in summary['groups']] == [2, 2]
+    assert summary['totals']['columns']['Salary']['nulls'] == 2
+    
+    output = app.processed_files[result['download_id']]['path']
+    assert load_workbook(output).sheetnames == ['Merged_Data', 'Summary']
+    
+    # no-store kept it out of the cache, so the session holds the only reference
+    app.processed_files.pop(result['download_id'])
+    app.release_output_ref(output)
+    assert not os.path.exists(output)
@@ -0,0 +1,138 @@
+import hashlib
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import app
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(app, 'CHUNK_SIZE', 1024)
+    return 1024
+
+
+def make_workbook(path, codes):
+    pd.DataFrame({'Code': codes, 'Amount': list(range(len(codes)))}).to_excel(path, index=False)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def put_chunk(client, upload_id, index, data, checksum=None):
+    return client.put(f'/upload/{upload_id}/chunk/{index}', data=data,
+                      headers={'X-Chunk-Checksum': checksum or hashlib.sha256(data).hexdigest()})
+
+
+def init_upload(client, filename, data):
+    response = client.post('/upload/init', json={'filename': filename, 'size': len(data)})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def chunks(data, chunk_size):
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def upload_file(client, filename, data, chunk_size):
+    upload_id = init_upload(client, filename, data)['upload_id']
+    for index, chunk in enumerate(chunks(data, chunk_size)):
+        assert put_chunk(client, upload_id, index, chunk).status_code == 200
+    assert client.post(f'/upload/{upload_id}/complete').status_code == 200
+    return upload_id
+
+
+def test_checksum_mismatch_is_rejected(client, tmp_path, small_chunks):
+    data = make_workbook(tmp_path / 'a.xlsx', ['A1', 'A2'])
+    upload_id = init_upload(client, 'a.xlsx', data)['upload_id']
+    
+    response = put_chunk(client, upload_id, 0, data[:small_chunks], checksum='0' * 64)
+    
+    assert response.status_code == 400
+    assert 'Checksum mismatch' in response.get_json()['error']
+    assert client.get(f'/upload/{upload_id}').get_json()['received_chunks'] == []
+
+
+def test_wrong_chunk_length_is_rejected(client, tmp_path, small_chunks):
+    data = make_workbook(tmp_path / 'a.xlsx', ['A1', 'A2'])
+    upload_id = init_upload(client, 'a.xlsx', data)['upload_id']
+    
+    response = put_chunk(client, upload_id, 0, data[:small_chunks - 1])
+    
+    assert response.status_code == 400
+    assert client.get(f'/upload/{upload_id}').get_json()['received_chunks'] == []
+
+
+def test_resume_reports_received_chunks(client, tmp_path, small_chunks):
+    data = make_workbook(tmp_path / 'a.xlsx', ['A1', 'A2'])
+    parts = chunks(data, small_chunks)
+    assert len(parts) >= 3
+    upload_id = init_upload(client, 'a.xlsx', data)['upload_id']
+    
+    for index in (0, 2):
+        assert put_chunk(client, upload_id, index, parts[index]).status_code == 200
+    
+    status = client.get(f'/upload/{upload_id}').get_json()
+    assert status['status'] == 'uploading'
+    assert status['received_chunks'] == [0, 2]
+    
+    response = client.post(f'/upload/{upload_id}/complete')
+    assert response.status_code == 400
+    assert 1 in response.get_json()['missing_chunks']
+    
+    for index in range(len(parts)):
+        if index not in (0, 2):
+            assert put_chunk(client, upload_id, index, parts[index]).status_code == 200
+    
+    assert client.post(f'/upload/{upload_id}/complete').status_code == 200
+    assert client.get(f'/upload/{upload_id}').get_json()['status'] == 'complete'
+
+
+def test_failed_complete_is_retryable(client, tmp_path, small_chunks, monkeypatch):
+    data = make_workbook(tmp_path / 'a.xlsx', ['A1', 'A2'])
+    upload_id = init_upload(client, 'a.xlsx', data)['upload_id']
+    for index, chunk in enumerate(chunks(data, small_chunks)):
+        put_chunk(client, upload_id, index, chunk)
+    
+    def unavailable(*args, **kwargs):
+        raise RuntimeError('executor unavailable')
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(app.parse_executor, 'submit', unavailable)
+        assert client.post(f'/upload/{upload_id}/complete').status_code == 500
+    
+    assert client.get(f'/upload/{upload_id}').get_json()['status'] == 'uploading'
+    
+    assert client.post(f'/upload/{upload_id}/complete').status_code == 200
+    response = client.post('/merge', data={'upload_ids': upload_id})
+    assert response.status_code == 200
+    assert response.get_json()['stats']['rows'] == 2
+
+
+def test_merge_keeps_selection_order_of_chunked_uploads(client, tmp_path, small_chunks):
+    first = make_workbook(tmp_path / 'first.xlsx', ['F1', 'F2'])
+    make_workbook(tmp_path / 'second.xlsx', ['S1'])
+    upload_id = upload_file(client, 'first.xlsx', first, small_chunks)
+    
+    with open(tmp_path / 'second.xlsx', 'rb') as f:
+        response = client.post('/merge', data={
+            'files': [(f, 'second.xlsx')],
+            'upload_ids': upload_id,
+            'upload_positions': '0'
+        }, content_type='multipart/form-data')
+    
+    assert response.status_code == 200
+    result = response.get_json()
+    ws = load_workbook(app.processed_files[result['download_id']]['path'])['Merged_Data']
+    assert [row[0] for row in ws.iter_rows(min_row=2, values_only=True)] == ['first.xlsx', 'first.xlsx', 'second.xlsx']
+    # The upload is consumed by the merge
+    assert client.get(f'/upload/{upload_id}').status_code == 404
+
+
+def test_merge_input_order():
+    assert app.merge_input_order(2, 1, []) == [('file', 0), ('file', 1), ('upload', 0)]
+    assert app.merge_input_order(2, 1, ['1']) == [('file', 0), ('upload', 0), ('file', 1)]
+    assert app.merge_input_order(1, 1, ['2']) is None
+    assert app.merge_input_order(1, 1, ['x']) is None
+    assert app.merge_input_order(0, 2, ['0', '0']) is None
+    assert app.merge_input_order(0, 2, ['0']) is None